@@ -4,6 +4,10 @@ from keras.utils import to_categorical
 from keras.models import model_from_json
 from keras.layers import LSTM, Dense
 from keras.callbacks import TensorBoard
+import argparse
+from camera_pipeline import CameraPipeline, add_source_arguments
+from roi_tracker import RoiTracker
+from sign_recognizer import SignRecognizer
 json_file = open("model.json", "r")
 model_json = json_file.read()
 json_file.close()
@@ -19,20 +23,83 @@ def prob_viz(res, actions, input_frame, colors,threshold):
 
 
 # 1. Detection state and smoothing parameters
-sequence = []
 sentence = []
 accuracy = []
-predictions = []
 
-# Prediction and smoothing parameters (aligned with server handler)
+# Prediction and smoothing parameters (same recognizer as the server, stricter constants)
 threshold = 0.85              # min softmax confidence for top-1
 margin_threshold = 0.12       # top1 - top2 margin
 smoothing_window = 8          # number of recent frames to consider
 stability_ratio = 0.7         # fraction of window that must agree
 min_sequence_for_inference = 20  # don't infer until we have this many frames
 
-cap = cv2.VideoCapture(0)
-print("Camera opened:", cap.isOpened())
+# Keypoint window and vote history live in the recognizer state
+recognizer = SignRecognizer(actions, threshold=threshold, margin_threshold=margin_threshold,
+                            smoothing_window=smoothing_window, stability_ratio=stability_ratio,
+                            min_sequence=min_sequence_for_inference, window_length=50, width=KEYPOINT_SIZE)
+state = recognizer.new_state()
+
+# Detection runs on a crop around the last frame's hand; full frame when lost
+roi_tracker = RoiTracker()
+roi = roi_tracker.new_state()
+last_region = None
+
+
+
+def process(frame):
+    """Inference thread: detection, recognizer, sentence; returns what draw() shows."""
+    global last_region
+    # Make detections (use ROI, show it on the full frame)
+    cropped = roi_tracker.crop(roi, frame)
+    box = cropped[1] if cropped is not None else None
+    if box != last_region:
+        hands.reset()  # tracking state is in the previous region's coordinates
+        last_region = box
+    image, results = mediapipe_detection(cropped[0] if cropped is not None else frame, hands)
+    if roi_tracker.update(roi, results, frame.shape, box) is None and box is not None:
+        # Lost the hand in the crop: search the whole frame
+        hands.reset()
+        last_region = None
+        image, results = mediapipe_detection(frame, hands)
+        roi_tracker.update(roi, results, frame.shape)
+
+    # Append only when a hand is detected to avoid noisy zeros
+    # (no hand clears the short-term vote history)
+    keypoints = extract_keypoints(results) if results and getattr(results, 'multi_hand_landmarks', None) else None
+
+    try:
+        # Only infers once the window has enough temporal context
+        result = recognizer.process(state, keypoints, lambda windows: model.predict(windows, verbose=0))
+        if result is not None and result[2] is not None:
+            _, top_prob, predicted_action = result
+            if len(sentence) == 0 or predicted_action != sentence[-1]:
+                sentence.append(predicted_action)
+                accuracy.append(f"{int(round(top_prob*100))}%")
+
+        # Keep only the most recent finalized sign
+        del sentence[:-1]
+        del accuracy[:-1]
+    except Exception:
+        pass
+    return box, "Output: "+' '.join(sentence)+''.join(accuracy)
+
+
+def draw(frame, shown):
+    """Render thread: the newest result on the newest frame."""
+    box, text = shown if shown is not None else (None, "Output: ")
+    if box is not None:
+        frame = cv2.rectangle(frame, box[:2], box[2:], 255, 2)
+    cv2.rectangle(frame, (0,0), (300, 40), (245, 117, 16), -1)
+    cv2.putText(frame, text, (3,30),
+                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+    return frame
+
+
+# Capture, inference and display run on separate threads (camera_pipeline.py);
+# --source video.mp4 --headless runs without a camera or a window
+args = add_source_arguments(argparse.ArgumentParser(description="Live sign recognition")).parse_args()
+pipeline = CameraPipeline(args.source, process, draw, headless=args.headless, out=args.out).open()
+print("Camera opened:", args.source)
 # Set mediapipe model (higher accuracy + stability)
 with mp_hands.Hands(
     static_image_mode=False,
@@ -40,73 +107,6 @@ with mp_hands.Hands(
     model_complexity=1,
     min_detection_confidence=0.6,
     min_tracking_confidence=0.6) as hands:
-    while cap.isOpened():
-
-        # Read feed
-        ret, frame = cap.read()
-
-        # Make detections (use ROI, show it on the full frame)
-        cropframe = frame[40:400, 0:300]
-        frame = cv2.rectangle(frame, (0, 40), (300, 400), 255, 2)
-        image, results = mediapipe_detection(cropframe, hands)
-
-        # Append only when a hand is detected to avoid noisy zeros
-        if results and getattr(results, 'multi_hand_landmarks', None):
-            keypoints = extract_keypoints(results)
-            sequence.append(keypoints)
-            sequence = sequence[-50:]
-        else:
-            # No hand detected – clear short-term vote history
-            predictions = []
-
-        try:
-            # Only infer when we have enough temporal context
-            if len(sequence) >= min_sequence_for_inference:
-                input_seq = np.expand_dims(sequence, axis=0)
-                res = model.predict(input_seq, verbose=0)[0]
-
-                top_idx = int(np.argmax(res))
-                top_prob = float(res[top_idx])
-                second_prob = float(np.partition(res, -2)[-2]) if len(res) > 1 else 0.0
-
-                # Update recent predictions window
-                predictions.append(top_idx)
-                predictions = predictions[-smoothing_window:]
-
-                from collections import Counter
-                if predictions:
-                    counts = Counter(predictions)
-                    most_common_idx, most_common_count = counts.most_common(1)[0]
-                else:
-                    most_common_idx, most_common_count = top_idx, 0
-
-                required_count = max(1, int(np.ceil(stability_ratio * max(1, len(predictions)))))
-
-                is_confident = (top_prob >= threshold) and ((top_prob - second_prob) >= margin_threshold)
-                is_stable_vote = (most_common_idx == top_idx) and (most_common_count >= required_count)
-
-                if is_confident and is_stable_vote:
-                    predicted_action = actions[top_idx]
-                    if len(sentence) == 0 or predicted_action != sentence[-1]:
-                        sentence.append(predicted_action)
-                        accuracy.append(f"{int(round(top_prob*100))}%")
-
-                # Keep only the most recent finalized sign
-                if len(sentence) > 1:
-                    sentence = sentence[-1:]
-                    accuracy = accuracy[-1:]
-        except Exception:
-            pass
-            
-        cv2.rectangle(frame, (0,0), (300, 40), (245, 117, 16), -1)
-        cv2.putText(frame,"Output: "+' '.join(sentence)+''.join(accuracy), (3,30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-
-        # Show to screen
-        cv2.imshow('OpenCV Feed', frame)
-
-        # Break gracefully
-        if cv2.waitKey(10) & 0xFF == ord('q'):
-            break
-    cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+    stats = pipeline.run()
+print(f"Frames: {stats['captured']} captured, {stats['inferred']} inferred, {stats['dropped']} dropped; "
+      f"inference {stats['infer_ms']} ms, result age {stats['result_age_ms']} ms")
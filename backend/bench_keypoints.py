@@ -0,0 +1,61 @@
+# bench_keypoints.py
+# Micro-benchmark: extract_keypoints before/after the allocation-free rewrite.
+#   python bench_keypoints.py [--image Image/A/0.png] [--number 5000]
+import argparse
+import timeit
+
+import numpy as np
+
+from function import *
+
+
+def extract_keypoints_reference(results):
+    # Previous implementation (list of lists + several temporaries), kept for comparison
+    if results.multi_hand_landmarks:
+        for hand_landmarks in results.multi_hand_landmarks:
+            rh = np.array([[res.x, res.y, res.z] for res in hand_landmarks.landmark])
+            max_vals = np.max(rh, axis=0)
+            min_vals = np.min(rh, axis=0)
+            diff = np.where(max_vals - min_vals == 0, 1e-6, max_vals - min_vals)
+            rh = (rh - min_vals) / diff
+            return rh.flatten()
+    return np.zeros(21 * 3)
+
+
+def detect_hand(paths):
+    with mp_hands.Hands(static_image_mode=True, max_num_hands=1, model_complexity=0) as hands:
+        for path in paths:
+            frame = cv2.imread(path)
+            if frame is None:
+                continue
+            _, results = mediapipe_detection(frame, hands)
+            if results.multi_hand_landmarks:
+                return path, results
+    raise SystemExit("No hand detected in the sample images")
+
+
+def per_call_us(fn, number, repeat=5):
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark extract_keypoints")
+    parser.add_argument("--image", nargs="*", default=[f"Image/{a}/0.png" for a in actions])
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    path, results = detect_hand(args.image)
+    buf = np.empty(KEYPOINT_SIZE, dtype=np.float32)
+
+    expected = extract_keypoints_reference(results)
+    got = extract_keypoints(results, out=buf)
+    max_diff = float(np.max(np.abs(expected - got)))
+
+    before = per_call_us(lambda: extract_keypoints_reference(results), args.number)
+    after = per_call_us(lambda: extract_keypoints(results), args.number)
+    after_buf = per_call_us(lambda: extract_keypoints(results, out=buf), args.number)
+
+    print(f"Sample: {path} (max |Δ| vs reference = {max_diff:.2e})")
+    print(f"reference               : {before:7.2f} µs/call")
+    print(f"extract_keypoints       : {after:7.2f} µs/call  ({before / after:.1f}x)")
+    print(f"extract_keypoints(out=) : {after_buf:7.2f} µs/call  ({before / after_buf:.1f}x)")
@@ -0,0 +1,213 @@
+# bench_predict.py
+# Replays recorded frames from Image/ through each stage of the predict path
+# (decode -> MediaPipe -> extract_keypoints -> predict_sign) and through the full
+# POST /api/predict route (Flask test client) at several concurrency levels.
+#
+#   python bench_predict.py [--sessions 1 4 16 64] [--requests 60] [--out bench.json] [--compare old.json]
+#
+# Every session is a thread that sends its next frame as soon as the previous
+# one returns (like the browser loop). Results are saved as JSON with the git
+# commit, so runs from two commits can be compared with --compare.
+import argparse
+import base64
+import glob
+import json
+import os
+import subprocess
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from function import actions, extract_keypoints, mediapipe_detection, mp_hands
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_PATH = os.path.join(BASE_DIR, 'Image')
+SESSION_LEVELS = (1, 4, 16, 64)
+TARGETS = ("decode_base64_image", "mediapipe_detection", "extract_keypoints", "predict_sign", "route")
+
+
+# ==============================
+# Frames
+# ==============================
+def load_frames(image_path=IMAGE_PATH, limit=100, jpeg_quality=70):
+    """Recorded frames as JPEG data URLs (what the frontend sends), spread over all letters."""
+    paths = []
+    per_letter = max(1, limit // len(actions))
+    for action in actions:
+        found = sorted(glob.glob(os.path.join(image_path, action, "*.png")))
+        paths.extend(found[:per_letter])
+    frames = []
+    for path in paths[:limit]:
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        if ok:
+            frames.append("data:image/jpeg;base64," + base64.b64encode(jpeg.tobytes()).decode("ascii"))
+    if not frames:
+        raise SystemExit(f"No frames found under {image_path}")
+    return frames
+
+
+def detect_all(frames):
+    """Decoded frames + MediaPipe results for the extract_keypoints stage."""
+    from image_decode import decode_base64_image
+
+    decoded, results = [], []
+    with mp_hands.Hands(static_image_mode=True, max_num_hands=1, model_complexity=0) as hands:
+        for data_url in frames:
+            frame = decode_base64_image(data_url)
+            decoded.append(frame)
+            results.append(mediapipe_detection(frame, hands)[1])
+    return decoded, results
+
+
+# ==============================
+# Targets
+# ==============================
+def make_target(name, frames, decoded, results):
+    """Returns call(session_id, i) for one stage / the route."""
+    import model_handler
+
+    if name == "decode_base64_image":
+        return lambda session_id, i: model_handler.decode_base64_image(frames[i % len(frames)])
+    if name == "mediapipe_detection":
+        # Goes through the server's detector pool, so contention is included
+        return lambda session_id, i: model_handler.hands_pool.detect(decoded[i % len(decoded)], session_id)
+    if name == "extract_keypoints":
+        return lambda session_id, i: extract_keypoints(results[i % len(results)])
+    if name == "predict_sign":
+        return lambda session_id, i: model_handler.predict_sign(frames[i % len(frames)], session_id=session_id)
+    if name == "route":
+        import server
+        from server import app
+
+        server.model.wait()  # predict routes answer 503 until the model is warmed up
+
+        clients = threading.local()
+
+        def call(session_id, i):
+            if not hasattr(clients, "client"):
+                clients.client = app.test_client()
+            response = clients.client.post("/api/predict", json={"image": frames[i % len(frames)],
+                                                                 "sessionId": session_id})
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return call
+    raise ValueError(f"Unknown target '{name}'")
+
+
+def run_level(call, name, sessions, requests_per_session):
+    """``sessions`` threads, each sending ``requests_per_session`` frames back to back."""
+    latencies = [[] for _ in range(sessions)]
+    errors = [0] * sessions
+    start_barrier = threading.Barrier(sessions + 1)
+
+    def session_loop(index):
+        session_id = f"bench-{name}-{sessions}-{index}"
+        start_barrier.wait()
+        for i in range(requests_per_session):
+            started = time.perf_counter()
+            try:
+                call(session_id, index + i)
+            except Exception:
+                errors[index] += 1
+                continue
+            latencies[index].append((time.perf_counter() - started) * 1000.0)
+
+    threads = [threading.Thread(target=session_loop, args=(i,), daemon=True) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+
+    all_ms = np.concatenate([np.asarray(l, dtype=np.float64) for l in latencies]) if any(latencies) \
+        else np.zeros(0)
+    p50, p95, p99 = np.percentile(all_ms, [50, 95, 99]) if all_ms.size else (float("nan"),) * 3
+    return {
+        "target": name,
+        "sessions": sessions,
+        "requests": int(all_ms.size),
+        "errors": int(sum(errors)),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(all_ms.mean()), 3) if all_ms.size else None,
+        "fps": round(all_ms.size / wall, 2) if wall > 0 else None,
+    }
+
+
+# ==============================
+# Reporting
+# ==============================
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(rows, baseline=None):
+    previous = {(r["target"], r["sessions"]): r for r in (baseline or {}).get("results", [])}
+    header = f"{'target':<22}{'sess':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'fps':>9}{'err':>5}"
+    print(header + ("   Δp50    Δfps" if previous else ""))
+    for row in rows:
+        line = (f"{row['target']:<22}{row['sessions']:>5}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['fps']:>9.1f}{row['errors']:>5}")
+        old = previous.get((row["target"], row["sessions"]))
+        if old and old.get("p50_ms") and old.get("fps"):
+            line += (f"{(row['p50_ms'] / old['p50_ms'] - 1):>+7.0%}"
+                     f"{(row['fps'] / old['fps'] - 1):>+8.0%}")
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the predict path stage by stage")
+    parser.add_argument("--sessions", type=int, nargs="+", default=list(SESSION_LEVELS))
+    parser.add_argument("--requests", type=int, default=60,
+                        help="frames sent per session (>= 24 so the model actually runs)")
+    parser.add_argument("--frames", type=int, default=100, help="recorded frames to replay")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--image-path", default=IMAGE_PATH)
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--compare", default=None, help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    frames = load_frames(args.image_path, args.frames)
+    decoded, results = detect_all(frames)
+    print(f"🔹 {len(frames)} frames, {sum(bool(r.multi_hand_landmarks) for r in results)} with a hand")
+
+    rows = []
+    for name in args.targets:
+        call = make_target(name, frames, decoded, results)
+        call("bench-warmup", 0)
+        for sessions in args.sessions:
+            rows.append(run_level(call, name, sessions, args.requests))
+            print(f"   {name} x{sessions}: p50 {rows[-1]['p50_ms']:.2f} ms, {rows[-1]['fps']:.1f} fps", flush=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} (commit {baseline.get('commit')})")
+    print()
+    print_results(rows, baseline)
+
+    if args.out:
+        report = {
+            "commit": git_commit(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "config": {"sessions": args.sessions, "requests_per_session": args.requests,
+                       "frames": len(frames), "cpu_count": os.cpu_count(),
+                       "env": {k: v for k, v in os.environ.items() if k.startswith("HANDSIGN_")}},
+            "results": rows,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"\n✅ Wrote {args.out}")
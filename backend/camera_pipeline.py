@@ -0,0 +1,290 @@
+# camera_pipeline.py
+# Threaded capture -> inference -> render loop for the desktop tools (app.py,
+# collectdata.py). Capture never waits for the model: its thread keeps only
+# the newest frame, the inference thread always takes the newest one (frames
+# that arrived while it was busy are dropped, and counted), and rendering
+# shows every captured frame with the newest result drawn on top, plus an
+# FPS / latency overlay per stage.
+#
+#   python camera_pipeline.py [--source 0 | video.mp4] [--headless] [--out annotated.mp4]
+#
+# Video files are paced at their own frame rate (like a camera), so
+# ``--headless`` runs show the same dropping behaviour without a camera.
+# The render loop runs on the calling thread: HighGUI windows must be driven
+# from the main thread on some platforms (macOS).
+import argparse
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class RateMeter:
+    """Rate and mean duration of the last ``window`` events of one stage."""
+
+    def __init__(self, window=30):
+        self.times = deque(maxlen=window)
+        self.durations = deque(maxlen=window)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def tick(self, duration=None):
+        with self._lock:
+            self.times.append(time.perf_counter())
+            if duration is not None:
+                self.durations.append(duration)
+            self.count += 1
+
+    @property
+    def fps(self):
+        with self._lock:
+            if len(self.times) < 2 or self.times[-1] == self.times[0]:
+                return 0.0
+            return (len(self.times) - 1) / (self.times[-1] - self.times[0])
+
+    @property
+    def latency_ms(self):
+        with self._lock:
+            return 1000.0 * sum(self.durations) / len(self.durations) if self.durations else 0.0
+
+
+class LatestSlot:
+    """Single-item mailbox between two threads: ``put`` replaces the held
+    item, ``get`` waits for one newer than the caller has seen. Items that
+    are replaced before anyone took them count as ``dropped``."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0       # sequence number of the held item
+        self._taken = 0     # newest sequence number taken by a consumer
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self._cond:
+            if self._seq > self._taken:
+                self.dropped += 1
+            self._item = item
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, after=0, timeout=None, take=True):
+        """(seq, item) of an item newer than ``after``, or (after, None) on
+        timeout or once closed. ``take=False`` peeks without marking it taken."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after or self.closed, timeout):
+                return after, None
+            if self._seq <= after:
+                return after, None
+            if take:
+                self._taken = self._seq
+            return self._seq, self._item
+
+    def peek(self):
+        with self._cond:
+            return self._item
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class CameraPipeline:
+    """Capture, inference and render stages around two user callbacks.
+
+    - ``process(frame) -> result``: runs on the inference thread (MediaPipe,
+      model); None skips the stage (capture + render only)
+    - ``draw(frame, result) -> frame``: runs on the render loop; ``result``
+      is the newest one (None until the first)
+    - ``on_key(key, frame)``: key presses with the raw frame on screen
+    - ``quit_keys``: keys that stop the loop
+    - ``realtime``: pace file sources at their frame rate (default for files)
+    """
+
+    def __init__(self, source=0, process=None, draw=None, on_key=None, headless=False, out=None,
+                 window_name="OpenCV Feed", quit_keys=(ord('q'),), realtime=None, overlay=True):
+        self.source = source
+        self.process = process
+        self.draw = draw
+        self.on_key = on_key
+        self.headless = headless
+        self.out = out
+        self.window_name = window_name
+        self.quit_keys = quit_keys
+        self.realtime = not isinstance(source, int) if realtime is None else realtime
+        self.overlay = overlay
+        self.frames = LatestSlot()    # (index, capture time, frame)
+        self.results = LatestSlot()   # (frame index, capture time, result)
+        self.meters = {"capture": RateMeter(), "infer": RateMeter(), "render": RateMeter()}
+        self.result_age = RateMeter()   # capture -> on screen, for the result being shown
+        self.error = None               # exception that ended the inference thread
+        self._stop = threading.Event()
+        self._cap = None
+
+    def open(self):
+        self._cap = cv2.VideoCapture(self.source)
+        if not self._cap.isOpened():
+            raise SystemExit(f"Cannot open {self.source}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ==============================
+    # Stages
+    # ==============================
+    def _capture(self):
+        cap = self._cap
+        fps = cap.get(cv2.CAP_PROP_FPS) if self.realtime else 0
+        interval = 1.0 / fps if fps and fps > 0 else 0.0
+        next_at = time.perf_counter()
+        index = 0
+        try:
+            while not self._stop.is_set():
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                self.meters["capture"].tick()
+                self.frames.put((index, time.perf_counter(), frame))
+                index += 1
+                if interval:
+                    next_at += interval
+                    time.sleep(max(0.0, next_at - time.perf_counter()))
+        finally:
+            cap.release()
+            self.frames.close()
+
+    def _infer(self):
+        seen = 0
+        try:
+            while not self._stop.is_set():
+                seen, item = self.frames.get(seen)
+                if item is None:
+                    if self.frames.closed:
+                        break
+                    continue
+                index, captured, frame = item
+                started = time.perf_counter()
+                result = self.process(frame)
+                self.meters["infer"].tick(time.perf_counter() - started)
+                self.results.put((index, captured, result))
+        except Exception as e:
+            self.error = e
+            self.stop()
+        finally:
+            self.results.close()
+
+    def _render_overlay(self, frame):
+        capture, infer, render = self.meters["capture"], self.meters["infer"], self.meters["render"]
+        lines = [f"capture {capture.fps:4.1f} fps"]
+        if self.process is not None:
+            lines.append(f"infer {infer.fps:4.1f} fps {infer.latency_ms:5.1f} ms, dropped {self.frames.dropped}")
+            lines.append(f"result age {self.result_age.latency_ms:5.1f} ms")
+        lines.append(f"render {render.fps:4.1f} fps {render.latency_ms:5.1f} ms")
+        y = frame.shape[0] - 10 - 18 * (len(lines) - 1)
+        for line in lines:
+            cv2.putText(frame, line, (8, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1, cv2.LINE_AA)
+            y += 18
+        return frame
+
+    def run(self):
+        """Starts capture / inference threads and renders until the source
+        ends or a quit key is pressed; returns ``get_stats()``."""
+        if self._cap is None:
+            self.open()
+        threads = [threading.Thread(target=self._capture, name="capture", daemon=True)]
+        if self.process is not None:
+            threads.append(threading.Thread(target=self._infer, name="infer", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        writer = None
+        seen = 0
+        try:
+            while not self._stop.is_set():
+                seen, item = self.frames.get(seen, timeout=0.1, take=self.process is None)
+                if item is None:
+                    if self.frames.closed:
+                        break
+                    continue
+                _, _, raw = item
+                started = time.perf_counter()
+                shown = self.results.peek()
+                frame = raw.copy()
+                if self.draw is not None:
+                    frame = self.draw(frame, shown[2] if shown is not None else None)
+                if shown is not None:
+                    self.result_age.tick(time.perf_counter() - shown[1])
+                if self.overlay:
+                    frame = self._render_overlay(frame)
+                if self.out:
+                    if writer is None:
+                        fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+                        writer = cv2.VideoWriter(self.out, cv2.VideoWriter_fourcc(*"mp4v"), fps,
+                                                 (frame.shape[1], frame.shape[0]))
+                    writer.write(frame)
+                self.meters["render"].tick(time.perf_counter() - started)
+                if not self.headless:
+                    cv2.imshow(self.window_name, frame)
+                    key = cv2.waitKey(1) & 0xFF
+                    if key in self.quit_keys:
+                        break
+                    if key != 0xFF and self.on_key is not None:
+                        self.on_key(key, raw)
+        finally:
+            self.stop()
+            for thread in threads:
+                thread.join(timeout=5)
+            if writer is not None:
+                writer.release()
+            if not self.headless:
+                cv2.destroyAllWindows()
+        if self.error is not None:
+            raise self.error
+        return self.get_stats()
+
+    def get_stats(self):
+        meters = self.meters
+        return {
+            "captured": meters["capture"].count,
+            "inferred": meters["infer"].count,
+            "dropped": self.frames.dropped if self.process is not None else 0,
+            "rendered": meters["render"].count,
+            "infer_ms": round(meters["infer"].latency_ms, 1),
+            "result_age_ms": round(self.result_age.latency_ms, 1),
+        }
+
+
+def parse_source(value):
+    """Camera index for digits, otherwise a video file path."""
+    return int(value) if value.isdigit() else value
+
+
+def add_source_arguments(parser):
+    parser.add_argument("--source", type=parse_source, default=0, help="camera index or video file")
+    parser.add_argument("--headless", action="store_true", help="no window (e.g. a video file on a server)")
+    parser.add_argument("--out", default=None, help="also write the rendered frames to this .mp4")
+    return parser
+
+
+if __name__ == "__main__":
+    # Pipeline check without a model: a slow stand-in for inference shows the drop behaviour
+    parser = add_source_arguments(argparse.ArgumentParser(description="Capture / inference / render pipeline check"))
+    parser.add_argument("--infer-ms", type=float, default=60.0, help="simulated inference time per frame")
+    args = parser.parse_args()
+
+    def fake_process(frame):
+        time.sleep(args.infer_ms / 1000.0)
+        return float(frame.mean())
+
+    def draw(frame, result):
+        if result is not None:
+            cv2.putText(frame, f"mean {result:.1f}", (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        return frame
+
+    stats = CameraPipeline(args.source, fake_process, draw, headless=args.headless, out=args.out).run()
+    print(f"✅ {stats['captured']} frames captured, {stats['inferred']} inferred, {stats['dropped']} dropped, "
+          f"{stats['rendered']} rendered; inference {stats['infer_ms']} ms, result age {stats['result_age_ms']} ms")
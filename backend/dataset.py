@@ -0,0 +1,212 @@
+# dataset.py
+# Packed keypoint dataset: one memory-mappable array instead of 39,000 tiny .npy files.
+#
+#   MP_Packed/X.npy       float32 (N, sequence_length, 63)
+#   MP_Packed/y.npy       int64   (N,) index into `actions`
+#   MP_Packed/index.json  actions, shapes and the (action, sequence) of every row
+#
+#   python dataset.py pack  [--data-path MP_Data] [--out MP_Packed]
+#   python dataset.py build [--image-path Image] [--out MP_Packed] [--workers N] [--legacy-tree]
+#   python dataset.py info  [--out MP_Packed]
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from function import DATA_PATH, KEYPOINT_SIZE, actions, no_sequences, sequence_length
+
+IMAGE_PATH = os.path.join('Image')
+
+PACKED_DATA_PATH = os.path.join('MP_Packed')
+
+_X_FILE = "X.npy"
+_Y_FILE = "y.npy"
+_INDEX_FILE = "index.json"
+
+
+def packed_exists(packed_path=PACKED_DATA_PATH):
+    return all(os.path.exists(os.path.join(packed_path, name)) for name in (_X_FILE, _Y_FILE, _INDEX_FILE))
+
+
+def _write_index(packed_path, shape, entries, source, **extra):
+    meta = {
+        "actions": [str(a) for a in actions],
+        "shape": [int(n) for n in shape],
+        "sequence_length": int(shape[1]),
+        "source": source,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "entries": entries,
+    }
+    meta.update(extra)
+    with open(os.path.join(packed_path, _INDEX_FILE), "w") as f:
+        json.dump(meta, f, indent=1)
+    return meta
+
+
+def pack_dataset(data_path=DATA_PATH, packed_path=PACKED_DATA_PATH):
+    """Convert the MP_Data/<action>/<sequence>/<frame>.npy tree into the packed format.
+
+    Incomplete sequences are skipped (same rule as trainmodel.py). Rows are
+    streamed into an open_memmap so the tree never has to fit in RAM twice.
+    """
+    complete, skipped = [], []
+    for action in actions:
+        for sequence in range(no_sequences):
+            seq_dir = os.path.join(data_path, action, str(sequence))
+            present = sum(os.path.exists(os.path.join(seq_dir, f"{frame_num}.npy"))
+                          for frame_num in range(sequence_length))
+            if present == sequence_length:
+                complete.append((action, sequence))
+            else:
+                skipped.append({"action": str(action), "sequence": sequence, "frames": present})
+
+    os.makedirs(packed_path, exist_ok=True)
+    X = np.lib.format.open_memmap(os.path.join(packed_path, _X_FILE), mode="w+", dtype=np.float32,
+                                  shape=(len(complete), sequence_length, KEYPOINT_SIZE))
+    label_map = {label: num for num, label in enumerate(actions)}
+    y = np.empty(len(complete), dtype=np.int64)
+    for row, (action, sequence) in enumerate(complete):
+        seq_dir = os.path.join(data_path, action, str(sequence))
+        for frame_num in range(sequence_length):
+            X[row, frame_num] = np.load(os.path.join(seq_dir, f"{frame_num}.npy"))
+        y[row] = label_map[action]
+    X.flush()
+    del X
+
+    np.save(os.path.join(packed_path, _Y_FILE), y)
+    return _write_index(
+        packed_path,
+        (len(complete), sequence_length, KEYPOINT_SIZE),
+        [{"action": str(a), "sequence": s} for a, s in complete],
+        os.path.abspath(data_path),
+        skipped=skipped,
+    )
+
+
+def load_packed(packed_path=PACKED_DATA_PATH, mmap=True):
+    """Returns (X, y, meta). X is a read-only memory map unless ``mmap=False``."""
+    X = np.load(os.path.join(packed_path, _X_FILE), mmap_mode="r" if mmap else None)
+    y = np.load(os.path.join(packed_path, _Y_FILE))
+    with open(os.path.join(packed_path, _INDEX_FILE)) as f:
+        meta = json.load(f)
+    if meta.get("actions") != [str(a) for a in actions]:
+        raise ValueError(f"{packed_path} was built for a different action list; re-run `python dataset.py pack`")
+    return X, y, meta
+
+
+# ==============================
+# Headless parallel extraction (replaces data.py's interactive loop)
+# ==============================
+_hands = None
+
+
+def _init_extract_worker():
+    # One Hands instance per worker process
+    global _hands
+    from function import mp_hands
+    _hands = mp_hands.Hands(static_image_mode=True, max_num_hands=1, model_complexity=0,
+                            min_detection_confidence=0.5)
+
+
+def _extract_image(path):
+    import cv2
+    from function import extract_keypoints, mediapipe_detection
+
+    frame = cv2.imread(path)
+    if frame is None:
+        return None
+    _, results = mediapipe_detection(frame, _hands)
+    return extract_keypoints(results)
+
+
+def build_dataset(image_path=IMAGE_PATH, packed_path=PACKED_DATA_PATH, workers=None,
+                  sequences=no_sequences, legacy_data_path=None, progress_every=50):
+    """Extract keypoints from Image/<action>/<sequence>.png into the packed format.
+
+    data.py ran MediaPipe 50 times on the same still image per sequence (plus
+    drawing and imshow). Here each image is read and detected once, the
+    landmark vector is reused for all ``sequence_length`` frames, and images
+    are spread over a process pool. ``legacy_data_path`` also writes the old
+    MP_Data/<action>/<sequence>/<frame>.npy tree.
+    """
+    jobs = [(action, sequence, os.path.join(image_path, action, f"{sequence}.png"))
+            for action in actions for sequence in range(sequences)]
+    missing = [{"action": str(a), "sequence": s} for a, s, path in jobs if not os.path.exists(path)]
+    jobs = [job for job in jobs if os.path.exists(job[2])]
+
+    workers = workers or os.cpu_count() or 1
+    keypoints = [None] * len(jobs)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_extract_worker) as pool:
+        for done, result in enumerate(pool.map(_extract_image, [job[2] for job in jobs],
+                                               chunksize=max(1, len(jobs) // (workers * 8))), 1):
+            keypoints[done - 1] = result
+            if done % progress_every == 0 or done == len(jobs):
+                elapsed = time.perf_counter() - start
+                print(f"🔹 {done}/{len(jobs)} images ({done / elapsed:.1f} img/s)", flush=True)
+
+    rows = [i for i, k in enumerate(keypoints) if k is not None]
+    unreadable = [{"action": str(jobs[i][0]), "sequence": jobs[i][1]} for i, k in enumerate(keypoints) if k is None]
+    label_map = {label: num for num, label in enumerate(actions)}
+
+    # Every frame of a sequence comes from the same still image
+    X = np.repeat(np.stack([keypoints[i] for i in rows]).astype(np.float32)[:, np.newaxis], sequence_length, axis=1) \
+        if rows else np.empty((0, sequence_length, KEYPOINT_SIZE), dtype=np.float32)
+    y = np.array([label_map[jobs[i][0]] for i in rows], dtype=np.int64)
+
+    os.makedirs(packed_path, exist_ok=True)
+    np.save(os.path.join(packed_path, _X_FILE), X)
+    np.save(os.path.join(packed_path, _Y_FILE), y)
+    meta = _write_index(
+        packed_path, X.shape,
+        [{"action": str(jobs[i][0]), "sequence": jobs[i][1]} for i in rows],
+        os.path.abspath(image_path),
+        skipped=missing + unreadable,
+        extraction_seconds=round(time.perf_counter() - start, 3),
+        workers=workers,
+    )
+
+    if legacy_data_path:
+        for i, row in enumerate(rows):
+            action, sequence, _ = jobs[row]
+            seq_dir = os.path.join(legacy_data_path, action, str(sequence))
+            os.makedirs(seq_dir, exist_ok=True)
+            for frame_num in range(sequence_length):
+                np.save(os.path.join(seq_dir, str(frame_num)), X[i, frame_num])
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Packed keypoint dataset tools")
+    parser.add_argument("command", choices=["pack", "build", "info"])
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--image-path", default=IMAGE_PATH)
+    parser.add_argument("--out", default=PACKED_DATA_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    parser.add_argument("--sequences", type=int, default=no_sequences, help="images per letter")
+    parser.add_argument("--legacy-tree", action="store_true", help="also write MP_Data/<action>/<seq>/<frame>.npy")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        start = time.perf_counter()
+        meta = pack_dataset(args.data_path, args.out)
+        print(f"✅ Packed {meta['shape'][0]} sequences {tuple(meta['shape'])} into {args.out} "
+              f"in {time.perf_counter() - start:.1f}s")
+        for item in meta["skipped"]:
+            print(f"⚠️ Skipped {item['action']}-{item['sequence']}, incomplete data ({item['frames']}/{sequence_length})")
+    elif args.command == "build":
+        meta = build_dataset(args.image_path, args.out, workers=args.workers, sequences=args.sequences,
+                             legacy_data_path=args.data_path if args.legacy_tree else None)
+        n = meta["shape"][0]
+        print(f"✅ Built {n} sequences {tuple(meta['shape'])} into {args.out} in {meta['extraction_seconds']:.1f}s "
+              f"({n / max(meta['extraction_seconds'], 1e-9):.1f} img/s, {meta['workers']} workers)")
+        for item in meta["skipped"]:
+            print(f"⚠️ Skipped {item['action']}-{item['sequence']}, image missing or unreadable")
+    else:
+        X, y, meta = load_packed(args.out)
+        counts = np.bincount(y, minlength=len(actions))
+        print(f"{args.out}: X{X.shape} {X.dtype}, {len(y)} labels, created {meta['created']}")
+        print(" ".join(f"{a}:{c}" for a, c in zip(actions, counts)))
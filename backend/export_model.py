@@ -0,0 +1,198 @@
+# export_model.py
+# Smaller / faster variants of model.json + model.h5 for the server, plus a
+# size / latency / accuracy report against the float32 model. Size ratios are
+# relative to the model's float32 weights (4 bytes per parameter): model.h5,
+# or any save of the compiled model, can also hold optimizer state, which
+# would inflate the savings.
+#
+#   python export_model.py [--out exports] [--prune 0.5] [--runs 200]
+#
+#   exports/model_float32.tflite   TFLite, float32 weights
+#   exports/model_float16.tflite   TFLite, float16 weights
+#   exports/model_int8.tflite      TFLite, int8 dynamic-range quantized weights
+#   exports/model_pruned.npz       magnitude-pruned weights for the NumPy backend (float16, compressed)
+#   exports/report.json            the table printed at the end
+#
+# Serve one with e.g.
+#   HANDSIGN_INFERENCE_BACKEND=tflite HANDSIGN_MODEL_EXPORT=exports/model_int8.tflite python server.py
+import argparse
+import copy
+import json
+import os
+import time
+
+import numpy as np
+
+from dataset import PACKED_DATA_PATH, packed_exists, load_packed
+from function import KEYPOINT_SIZE, sequence_length
+from inference_backends import (
+    CompiledBackend, NumpyBackend, NumpyLSTM, TFLiteBackend, load_keras_model,
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPORT_DIR = os.path.join(BASE_DIR, 'exports')
+SPLIT_PATH = os.path.join(BASE_DIR, 'checkpoints', 'split.json')
+
+
+# ==============================
+# Exporters
+# ==============================
+def export_tflite(model, path, quantization=None):
+    """Convert to TFLite with batch size 1 and a dynamic time axis.
+
+    quantization: None (float32), "float16" or "int8" (dynamic-range: int8
+    weights, float activations - no calibration data needed).
+    """
+    import tensorflow as tf
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    # LSTM loops only convert with a static batch size; freezing the variables
+    # avoids resource ops the TFLite runtime does not support.
+    fn = tf.function(lambda x: model(x, training=False))
+    concrete = fn.get_concrete_function(tf.TensorSpec([1, None, KEYPOINT_SIZE], tf.float32))
+    frozen = convert_variables_to_constants_v2(concrete)
+
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([frozen])
+    if quantization:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+
+def prune_backend(backend, sparsity):
+    """Zero the smallest-magnitude ``sparsity`` fraction of every kernel (biases are kept)."""
+    def prune(w):
+        w = w.copy()
+        k = int(w.size * sparsity)
+        if k:
+            threshold = np.partition(np.abs(w).ravel(), k - 1)[k - 1]
+            w[np.abs(w) <= threshold] = 0.0
+        return w
+
+    layers = []
+    for layer in backend.layers:
+        pruned = copy.copy(layer)
+        pruned.kernel = prune(layer.kernel)
+        if isinstance(layer, NumpyLSTM):
+            pruned.recurrent_kernel = prune(layer.recurrent_kernel)
+        layers.append(pruned)
+    return NumpyBackend(layers)
+
+
+# ==============================
+# Report
+# ==============================
+def load_eval_set(packed_path=PACKED_DATA_PATH, split_path=SPLIT_PATH):
+    """Held-out test windows saved by trainmodel.py (all packed rows if no split exists)."""
+    if not packed_exists(packed_path):
+        return None, None, None
+    X, y, _ = load_packed(packed_path, mmap=True)
+    source = "all packed rows"
+    indices = np.arange(len(y))
+    if os.path.exists(split_path):
+        with open(split_path) as f:
+            split = json.load(f)
+        if split.get("n") == len(y) and split.get("test"):
+            indices = np.asarray(split["test"], dtype=np.int64)
+            source = "held-out test split"
+    return np.asarray(X[indices], dtype=np.float32), np.asarray(y[indices]), source
+
+
+def latency_ms(backend, runs, length=sequence_length):
+    window = np.random.default_rng(0).random((1, length, KEYPOINT_SIZE), dtype=np.float32)
+    for _ in range(5):
+        backend.predict(window)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict(window)
+        times.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(times))
+
+
+def predict_all(backend, X, batch_size=64):
+    return np.concatenate([backend.predict(X[i:i + batch_size]) for i in range(0, len(X), batch_size)])
+
+
+def build_report(variants, X, y, runs):
+    """variants: list of (name, size in bytes or None, backend); the first one is the reference."""
+    rows = []
+    reference_pred = None
+    for name, size, backend in variants:
+        row = {"variant": name, "size_mb": round(size / 1e6, 3) if size else None,
+               "latency_ms": round(latency_ms(backend, runs), 3)}
+        if X is not None:
+            pred = np.argmax(predict_all(backend, X), axis=-1)
+            if reference_pred is None:
+                reference_pred = pred
+            row["accuracy"] = round(float(np.mean(pred == y)), 4)
+            row["agreement"] = round(float(np.mean(pred == reference_pred)), 4)
+        rows.append(row)
+
+    reference = rows[0]
+    for row in rows:
+        if reference["size_mb"] and row["size_mb"]:
+            row["size_ratio"] = round(row["size_mb"] / reference["size_mb"], 3)
+        row["speedup"] = round(reference["latency_ms"] / row["latency_ms"], 2)
+        if "accuracy" in row:
+            row["accuracy_delta"] = round(row["accuracy"] - reference["accuracy"], 4)
+    return rows
+
+
+def print_report(rows, eval_source):
+    print(f"\nBatch-1 latency at {sequence_length} frames; accuracy on {eval_source or 'no dataset found'}; "
+          f"size ratio vs. {rows[0]['variant']}")
+    print(f"{'variant':<18}{'size MB':>9}{'ratio':>7}{'ms':>8}{'speedup':>9}{'acc':>8}{'Δacc':>8}{'agree':>8}")
+    for row in rows:
+        size = f"{row['size_mb']:.2f}" if row["size_mb"] else "-"
+        ratio = f"{row['size_ratio']:.2f}" if "size_ratio" in row else "-"
+        acc = f"{row['accuracy']:.2%}" if "accuracy" in row else "-"
+        delta = f"{row['accuracy_delta'] * 100:+.2f}" if "accuracy_delta" in row else "-"
+        agree = f"{row['agreement']:.2%}" if "agreement" in row else "-"
+        print(f"{row['variant']:<18}{size:>9}{ratio:>7}{row['latency_ms']:>8.2f}{row['speedup']:>8.2f}x"
+              f"{acc:>8}{delta:>8}{agree:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export quantized / pruned model variants")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--prune", type=float, default=0.5, help="fraction of kernel weights zeroed")
+    parser.add_argument("--runs", type=int, default=200, help="timed predictions per variant")
+    parser.add_argument("--packed-path", default=PACKED_DATA_PATH)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    model = load_keras_model(os.path.join(BASE_DIR, "model.json"), os.path.join(BASE_DIR, "model.h5"))
+    numpy_backend = NumpyBackend.from_keras(model)
+
+    # Raw float32 weights as the size baseline: saving the compiled model would
+    # also store the optimizer's slot variables (about 3x the weights with Adam)
+    weights_bytes = sum(w.nbytes for w in model.get_weights())
+    variants = [("keras float32", weights_bytes, CompiledBackend(model))]
+    for quantization in (None, "float16", "int8"):
+        name = quantization or "float32"
+        path = export_tflite(model, os.path.join(args.out, f"model_{name}.tflite"), quantization)
+        variants.append((f"tflite {name}", os.path.getsize(path), TFLiteBackend(path)))
+
+    pruned_path = os.path.join(args.out, "model_pruned.npz")
+    prune_backend(numpy_backend, args.prune).save(pruned_path, dtype=np.float16)
+    variants.append(("numpy float32", None, numpy_backend))
+    variants.append((f"numpy pruned {args.prune:.0%}", os.path.getsize(pruned_path), NumpyBackend.load(pruned_path)))
+
+    X, y, eval_source = load_eval_set(args.packed_path)
+    rows = build_report(variants, X, y, args.runs)
+    print_report(rows, eval_source)
+    h5_path = os.path.join(BASE_DIR, "model.h5")
+    h5_mb = os.path.getsize(h5_path) / 1e6 if os.path.exists(h5_path) else 0.0
+    if h5_mb:
+        print(f"(model.h5 is {h5_mb:.2f} MB; it may also hold optimizer state)")
+    with open(os.path.join(args.out, "report.json"), "w") as f:
+        json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "eval_set": eval_source,
+                   "size_baseline": "float32 weights (4 bytes per parameter)",
+                   "model_h5_mb": round(h5_mb, 3),
+                   "eval_windows": 0 if X is None else int(len(X)), "prune": args.prune,
+                   "variants": rows}, f, indent=1)
+    print(f"\n✅ Wrote {args.out}/report.json")
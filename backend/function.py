@@ -35,20 +35,52 @@ def draw_styled_landmarks(image, results):
 #     else:
 #         return np.zeros(21 * 3)
 
-def extract_keypoints(results):
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            rh = np.array([[res.x, res.y, res.z] for res in hand_landmarks.landmark])
+# 21 hand landmarks × (x, y, z)
+KEYPOINT_SIZE = 21 * 3
+
+def normalize_keypoints(keypoints, out=None):
+    # Per-axis min-max normalization of 21 [x, y, z] landmarks.
+    # Writes into `out` (may be `keypoints` itself) and returns a flat view of it.
+    if out is None:
+        out = np.array(keypoints, dtype=np.float32).reshape(KEYPOINT_SIZE)
+    elif out is not keypoints:
+        np.copyto(out.reshape(21, 3), np.asarray(keypoints).reshape(21, 3))
+    rh = out.reshape(21, 3)
+
+    rh -= rh.min(axis=0)
+    diff = rh.max(axis=0)
+    # Avoid division by zero in normalization
+    np.maximum(diff, 1e-6, out=diff)
+    rh /= diff
 
-            # Avoid division by zero in normalization
-            max_vals = np.max(rh, axis=0)
-            min_vals = np.min(rh, axis=0)
-            diff = np.where(max_vals - min_vals == 0, 1e-6, max_vals - min_vals)
-            rh = (rh - min_vals) / diff
+    return out.reshape(KEYPOINT_SIZE)
 
-            return rh.flatten()
+# Each NormalizedLandmark {x, y, z} serializes to 17 bytes: 0a 0f | 0d <x> | 15 <y> | 1d <z>.
+# When a landmark list has exactly that layout, x/y/z can be read as a strided
+# float32 view straight from the wire bytes instead of 63 Python attribute reads.
+_LANDMARK_WIRE_SIZE = 17
+_LANDMARK_WIRE_TAGS = ((0, b"\x0a" * 21), (1, b"\x0f" * 21), (2, b"\x0d" * 21),
+                       (7, b"\x15" * 21), (12, b"\x1d" * 21))
+
+def _landmarks_view(hand_landmarks):
+    wire = hand_landmarks.SerializeToString()
+    if len(wire) == 21 * _LANDMARK_WIRE_SIZE and all(
+            wire[offset::_LANDMARK_WIRE_SIZE] == tags for offset, tags in _LANDMARK_WIRE_TAGS):
+        return np.ndarray((21, 3), dtype='<f4', buffer=wire, offset=3, strides=(_LANDMARK_WIRE_SIZE, 5))
+    # Unexpected layout (e.g. visibility/presence set): read attributes
+    return np.array([[res.x, res.y, res.z] for res in hand_landmarks.landmark], dtype=np.float32)
+
+def extract_keypoints(results, out=None):
+    # Returns a normalized float32 (63,) vector; pass `out` to fill a preallocated buffer
+    if out is None:
+        out = np.empty(KEYPOINT_SIZE, dtype=np.float32)
+    if results.multi_hand_landmarks:
+        for hand_landmarks in results.multi_hand_landmarks:
+            np.copyto(out.reshape(21, 3), _landmarks_view(hand_landmarks))
+            return normalize_keypoints(out, out=out)
     # Always return same length vector
-    return np.zeros(21 * 3)
+    out.fill(0.0)
+    return out
 
 # Path for exported data (where .npy will be saved)
 DATA_PATH = os.path.join('MP_Data')
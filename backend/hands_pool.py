@@ -0,0 +1,129 @@
+# hands_pool.py
+import threading
+import time
+from contextlib import contextmanager
+
+from function import mediapipe_detection
+
+
+class HandsPool:
+    """Bounded pool of MediaPipe Hands detectors.
+
+    Each detector has its own lock, so up to ``size`` frames are detected in
+    parallel (MediaPipe releases the GIL inside its graph). Sessions are
+    pinned to one detector on first use (least-loaded assignment) so that
+    ``static_image_mode=False`` keeps tracking continuity per session.
+
+    ``observer(wait_seconds, detect_seconds)``, if given, is called after
+    every ``detect`` (used for the /metrics histograms).
+    """
+
+    def __init__(self, factory, size=2, observer=None):
+        self.size = max(1, int(size))
+        self.observer = observer
+        self._detectors = [factory() for _ in range(self.size)]
+        self._locks = [threading.Lock() for _ in range(self.size)]
+        self._regions = [None] * self.size  # (session_id, region) each detector last tracked (None: reset)
+        self._sessions_per_detector = [0] * self.size
+        self._affinity = {}
+        self._assign_lock = threading.Lock()
+
+        # Stats
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._detect_total = 0.0
+        self._detect_max = 0.0
+
+    def _slot_for(self, session_id):
+        with self._assign_lock:
+            slot = self._affinity.get(session_id)
+            if slot is None:
+                slot = min(range(self.size), key=self._sessions_per_detector.__getitem__)
+                self._affinity[session_id] = slot
+                self._sessions_per_detector[slot] += 1
+            return slot
+
+    def release_session(self, session_id):
+        """Forget a session's detector assignment (call when the session expires)."""
+        with self._assign_lock:
+            slot = self._affinity.pop(session_id, None)
+            if slot is not None:
+                self._sessions_per_detector[slot] -= 1
+
+    @contextmanager
+    def _acquire(self, session_id):
+        slot = self._slot_for(session_id)
+        t0 = time.perf_counter()
+        with self._locks[slot]:
+            waited = time.perf_counter() - t0
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            yield self._detectors[slot], waited, slot
+
+    @contextmanager
+    def checkout(self, session_id):
+        """Yield the session's detector while holding its lock."""
+        with self._acquire(session_id) as (hands, _, _):
+            yield hands
+
+    def detect(self, frame, session_id, region=None):
+        """Run ``mediapipe_detection`` on the session's detector.
+
+        ``region`` names the part of the camera image ``frame`` shows (e.g. a
+        crop box; None for the whole frame). A tracking-mode detector is reset
+        whenever it is handed a different session or region than last time,
+        so it never tracks one session's hand in another session's frames or
+        in stale coordinates.
+        """
+        with self._acquire(session_id) as (hands, waited, slot):
+            t0 = time.perf_counter()
+            key = (session_id, region)
+            if self._regions[slot] != key:
+                if self._regions[slot] is not None:
+                    hands.reset()
+                self._regions[slot] = key
+            image, results = mediapipe_detection(frame, hands)
+            elapsed = time.perf_counter() - t0
+        with self._stats_lock:
+            self._detect_total += elapsed
+            self._detect_max = max(self._detect_max, elapsed)
+        if self.observer is not None:
+            self.observer(waited, elapsed)
+        return image, results
+
+    def warmup(self, frame):
+        """Run ``frame`` through every detector once (graph start-up, first-inference allocations).
+
+        ``frame`` should show a hand: the landmark model only runs once the
+        palm detector finds one. Returns how many detectors found it.
+        """
+        found = 0
+        for slot, (lock, hands) in enumerate(zip(self._locks, self._detectors)):
+            with lock:
+                _, results = mediapipe_detection(frame, hands)
+                found += bool(results.multi_hand_landmarks)
+                hands.reset()
+                self._regions[slot] = None
+        return found
+
+    def get_stats(self):
+        with self._stats_lock, self._assign_lock:
+            n = self._checkouts
+            return {
+                "size": self.size,
+                "sessions_per_detector": list(self._sessions_per_detector),
+                "checkouts": n,
+                "avg_queue_wait_ms": round(1000.0 * self._wait_total / n, 3) if n else 0.0,
+                "max_queue_wait_ms": round(1000.0 * self._wait_max, 3),
+                "avg_detection_ms": round(1000.0 * self._detect_total / n, 3) if n else 0.0,
+                "max_detection_ms": round(1000.0 * self._detect_max, 3),
+            }
+
+    def close(self):
+        for lock, hands in zip(self._locks, self._detectors):
+            with lock:
+                hands.close()
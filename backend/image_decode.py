@@ -0,0 +1,49 @@
+# image_decode.py
+import base64
+import io
+
+import cv2
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+# ==============================
+# Helper: decode base64 image
+# ==============================
+def decode_base64_image(base64_str):
+    """Converts base64 image (from browser) to OpenCV BGR frame.
+    Tries PIL first; falls back to OpenCV if needed.
+    """
+    try:
+        header, b64 = base64_str.split(",", 1)
+    except ValueError:
+        b64 = base64_str
+        header = ""
+
+    image_data = base64.b64decode(b64)
+    # First try PIL (usually fastest)
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        return frame
+    except (UnidentifiedImageError, OSError):
+        pass
+
+    # Fallback: use OpenCV decoding
+    np_bytes = np.frombuffer(image_data, dtype=np.uint8)
+    frame = cv2.imdecode(np_bytes, cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Unable to decode image data; ensure WebP/JPEG support is installed.")
+    return frame
+
+
+def decode_image_bytes(image_bytes):
+    """Decodes raw encoded image bytes (JPEG/WebP/PNG) to an OpenCV BGR frame.
+    Wraps the request buffer with a memoryview so no intermediate copy is made.
+    """
+    np_bytes = np.frombuffer(memoryview(image_bytes), dtype=np.uint8)
+    if np_bytes.size == 0:
+        raise ValueError("Empty image payload")
+    frame = cv2.imdecode(np_bytes, cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Unable to decode image data; ensure WebP/JPEG support is installed.")
+    return frame
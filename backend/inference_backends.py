@@ -0,0 +1,355 @@
+# inference_backends.py
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+# ==============================
+# Model loading
+# ==============================
+def load_keras_model(json_path, weights_path):
+    """Rebuild the Keras model from model.json and load model.h5 weights."""
+    from keras.models import model_from_json
+
+    if not os.path.exists(json_path):
+        raise FileNotFoundError(f"model.json not found at {json_path}")
+
+    with open(json_path, "r") as json_file:
+        model = model_from_json(json_file.read())
+
+    if not os.path.exists(weights_path):
+        # Surface a clear message; training/export may be required.
+        raise FileNotFoundError(
+            f"model.h5 not found at {weights_path}. Ensure weights are exported next to model.json."
+        )
+
+    model.load_weights(weights_path)
+    return model
+
+
+def build_random_model(json_path, seed=0):
+    """model.json's architecture with seeded random weights.
+
+    The layers are rebuilt from their configs rather than via
+    ``model_from_json``, so Keras 2 and Keras 3 both read the file. Only for
+    checks that compare backends against each other (no model.h5 needed).
+    """
+    import keras
+
+    with open(json_path, "r") as json_file:
+        config = json.load(json_file)["config"]
+    keras.utils.set_random_seed(seed)
+    layers = []
+    for layer in config["layers"]:
+        kind, options = layer["class_name"], layer["config"]
+        if not layers:
+            input_shape = options.get("batch_input_shape") or options.get("batch_shape")
+            layers.append(keras.Input(shape=tuple(input_shape[1:])))
+        if kind == "InputLayer":
+            continue
+        if kind == "LSTM":
+            layers.append(keras.layers.LSTM(options["units"], activation=options["activation"],
+                                            return_sequences=options["return_sequences"]))
+        elif kind == "Dense":
+            layers.append(keras.layers.Dense(options["units"], activation=options["activation"]))
+        elif kind == "Dropout":
+            layers.append(keras.layers.Dropout(options["rate"]))
+        else:
+            raise ValueError(f"Unsupported layer in model.json: {kind}")
+    return keras.Sequential(layers)
+
+
+def load_check_model(base_dir, seed=0):
+    """Trained model for the ``__main__`` checks, or model.json with random weights when model.h5 is missing (CI)."""
+    json_path = os.path.join(base_dir, "model.json")
+    weights_path = os.path.join(base_dir, "model.h5")
+    if os.path.exists(weights_path):
+        return load_keras_model(json_path, weights_path)
+    print(f"🔹 model.h5 not found: checking model.json's architecture with random weights (seed {seed})")
+    return build_random_model(json_path, seed)
+
+
+# ==============================
+# Backends
+# ==============================
+class KerasBackend:
+    """Reference backend: plain ``model.predict`` (tf.data pipeline + callbacks per call)."""
+    name = "keras"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, batch):
+        return self.model.predict(batch, verbose=0)
+
+
+class CompiledBackend:
+    """``tf.function`` traced once for any (batch, timesteps, 63) float32 input."""
+    name = "compiled"
+
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self.model = model
+        n_features = int(model.input_shape[-1])
+        self._fn = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=[None, None, n_features], dtype=tf.float32)],
+            reduce_retracing=True,
+        )
+
+    def predict(self, batch):
+        return self._fn(np.asarray(batch, dtype=np.float32)).numpy()
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+    "softmax": _softmax,
+}
+
+
+def _activation(name):
+    if name not in _ACTIVATIONS:
+        raise ValueError(f"Unsupported activation for NumPy backend: {name}")
+    return _ACTIVATIONS[name]
+
+
+class NumpyLSTM:
+    """Single Keras-compatible LSTM layer (gate order i, f, c, o)."""
+
+    def __init__(self, kernel, recurrent_kernel, bias, activation="tanh",
+                 recurrent_activation="sigmoid", return_sequences=False):
+        self.kernel = np.asarray(kernel, dtype=np.float32)
+        self.recurrent_kernel = np.asarray(recurrent_kernel, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.units = self.recurrent_kernel.shape[0]
+        self.activation = _activation(activation)
+        self.recurrent_activation = _activation(recurrent_activation)
+        self.return_sequences = return_sequences
+
+    def initial_state(self, batch_size):
+        zeros = np.zeros((batch_size, self.units), dtype=np.float32)
+        return zeros, zeros.copy()
+
+    def step(self, x_proj, h, c):
+        """Advance one timestep given the already-projected input ``x @ kernel + bias``."""
+        z = x_proj + h @ self.recurrent_kernel
+        u = self.units
+        i = self.recurrent_activation(z[:, :u])
+        f = self.recurrent_activation(z[:, u:2 * u])
+        g = self.activation(z[:, 2 * u:3 * u])
+        o = self.recurrent_activation(z[:, 3 * u:])
+        c = f * c + i * g
+        h = o * self.activation(c)
+        return h, c
+
+    def __call__(self, x, initial_state=None, return_state=False, return_sequences=None):
+        if return_sequences is None:
+            return_sequences = self.return_sequences
+        batch, timesteps, _ = x.shape
+        # Input projection for every timestep in one matmul
+        x_proj = x @ self.kernel + self.bias
+        h, c = initial_state if initial_state is not None else self.initial_state(batch)
+        outputs = np.empty((batch, timesteps, self.units), dtype=np.float32) if return_sequences else None
+        for t in range(timesteps):
+            h, c = self.step(x_proj[:, t], h, c)
+            if outputs is not None:
+                outputs[:, t] = h
+        result = outputs if outputs is not None else h
+        return (result, (h, c)) if return_state else result
+
+
+class NumpyDense:
+    def __init__(self, kernel, bias, activation="linear"):
+        self.kernel = np.asarray(kernel, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.activation = _activation(activation)
+
+    def __call__(self, x):
+        return self.activation(x @ self.kernel + self.bias)
+
+
+class NumpyBackend:
+    """Pure-NumPy forward pass built from the trained LSTM/Dense weights.
+
+    Dropout is an identity at inference time and is skipped.
+    """
+    name = "numpy"
+
+    def __init__(self, layers):
+        self.layers = layers
+        self.lstm_layers = [layer for layer in layers if isinstance(layer, NumpyLSTM)]
+        self.head_layers = [layer for layer in layers if isinstance(layer, NumpyDense)]
+
+    @classmethod
+    def from_keras(cls, model):
+        layers = []
+        for layer in model.layers:
+            kind = layer.__class__.__name__
+            config = layer.get_config()
+            if kind == "LSTM":
+                kernel, recurrent_kernel, bias = layer.get_weights()
+                layers.append(NumpyLSTM(
+                    kernel, recurrent_kernel, bias,
+                    activation=config["activation"],
+                    recurrent_activation=config["recurrent_activation"],
+                    return_sequences=config["return_sequences"],
+                ))
+            elif kind == "Dense":
+                kernel, bias = layer.get_weights()
+                layers.append(NumpyDense(kernel, bias, activation=config["activation"]))
+            elif kind in ("Dropout", "InputLayer"):
+                continue
+            else:
+                raise ValueError(f"Unsupported layer for NumPy backend: {kind}")
+        return cls(layers)
+
+    def predict(self, batch):
+        x = np.asarray(batch, dtype=np.float32)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+    def save(self, path, dtype=np.float32):
+        """Write weights + layer config to a compressed .npz (dtype=float16 halves the size)."""
+        arrays, config = {}, []
+        for i, layer in enumerate(self.layers):
+            if isinstance(layer, NumpyLSTM):
+                arrays.update({f"{i}_kernel": layer.kernel, f"{i}_recurrent_kernel": layer.recurrent_kernel,
+                               f"{i}_bias": layer.bias})
+                config.append({"kind": "LSTM", "activation": _activation_name(layer.activation),
+                               "recurrent_activation": _activation_name(layer.recurrent_activation),
+                               "return_sequences": layer.return_sequences})
+            else:
+                arrays.update({f"{i}_kernel": layer.kernel, f"{i}_bias": layer.bias})
+                config.append({"kind": "Dense", "activation": _activation_name(layer.activation)})
+        arrays = {k: v.astype(dtype) for k, v in arrays.items()}
+        np.savez_compressed(path, config=np.array(json.dumps(config)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            layers = []
+            for i, layer_config in enumerate(json.loads(str(data["config"]))):
+                if layer_config["kind"] == "LSTM":
+                    layers.append(NumpyLSTM(
+                        data[f"{i}_kernel"], data[f"{i}_recurrent_kernel"], data[f"{i}_bias"],
+                        activation=layer_config["activation"],
+                        recurrent_activation=layer_config["recurrent_activation"],
+                        return_sequences=layer_config["return_sequences"],
+                    ))
+                else:
+                    layers.append(NumpyDense(data[f"{i}_kernel"], data[f"{i}_bias"],
+                                             activation=layer_config["activation"]))
+        return cls(layers)
+
+
+def _activation_name(fn):
+    return next(name for name, candidate in _ACTIVATIONS.items() if candidate is fn)
+
+
+class TFLiteBackend:
+    """TFLite interpreter for an exported (float16 / int8) model, see export_model.py.
+
+    The exported graph has batch size 1 and a dynamic time axis; the input
+    tensor is resized whenever the window length changes.
+    """
+    name = "tflite"
+
+    def __init__(self, path, num_threads=None):
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"TFLite model not found at {path}. Run export_model.py first.")
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self._input = self.interpreter.get_input_details()[0]["index"]
+        self._output = self.interpreter.get_output_details()[0]["index"]
+        self._shape = None
+        self._lock = threading.Lock()
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        outputs = []
+        with self._lock:
+            for window in batch:
+                shape = (1,) + window.shape
+                if shape != self._shape:
+                    self.interpreter.resize_tensor_input(self._input, shape)
+                    self.interpreter.allocate_tensors()
+                    self._shape = shape
+                self.interpreter.set_tensor(self._input, window[np.newaxis])
+                self.interpreter.invoke()
+                outputs.append(self.interpreter.get_tensor(self._output)[0])
+        return np.stack(outputs)
+
+
+def create_backend(name, model=None, path=None):
+    """Build the inference backend selected in config.
+
+    keras / compiled / numpy wrap the loaded Keras model; numpy and tflite can
+    instead load an exported variant from ``path`` (see export_model.py).
+    """
+    if name == KerasBackend.name:
+        return KerasBackend(model)
+    if name == CompiledBackend.name:
+        return CompiledBackend(model)
+    if name == NumpyBackend.name:
+        return NumpyBackend.load(path) if path else NumpyBackend.from_keras(model)
+    if name == TFLiteBackend.name:
+        if not path:
+            raise ValueError("The tflite backend needs an exported model path (HANDSIGN_MODEL_EXPORT)")
+        return TFLiteBackend(path)
+    raise ValueError(f"Unknown inference backend '{name}'. Choose one of: keras, compiled, numpy, tflite")
+
+
+# ==============================
+# Parity check
+# ==============================
+def check_parity(model, backend_names=("compiled", "numpy"), lengths=(24, 37, 50), batch_size=4, seed=0):
+    """Compare each backend against Keras ``model.predict`` on random keypoint windows.
+
+    Returns {backend_name: max_abs_diff}.
+    """
+    rng = np.random.default_rng(seed)
+    reference = KerasBackend(model)
+    n_features = int(model.input_shape[-1])
+    report = {}
+    for name in backend_names:
+        backend = create_backend(name, model)
+        worst = 0.0
+        for length in lengths:
+            batch = rng.random((batch_size, length, n_features), dtype=np.float32)
+            expected = reference.predict(batch)
+            got = backend.predict(batch)
+            worst = max(worst, float(np.max(np.abs(expected - got))))
+        report[name] = worst
+    return report
+
+
+if __name__ == "__main__":
+    model = load_check_model(os.path.dirname(os.path.abspath(__file__)))
+    tolerance = 1e-4
+    failed = False
+    for name, diff in check_parity(model).items():
+        ok = diff <= tolerance
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {name}: max |Δ| vs keras = {diff:.2e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,141 @@
+# inference_batcher.py
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class InferenceBatcher:
+    """Micro-batching scheduler for the sign model.
+
+    Callers submit one (timesteps, features) window each. A single worker
+    thread waits up to ``max_wait_ms`` for more windows to arrive, groups
+    them by length (the LSTM has no masking, so windows are bucketed rather
+    than zero-padded) and runs one batched forward pass per bucket.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0, name="inference-batcher"):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._pending = []
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        # Stats
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._forward_passes = 0
+        self._windows = 0
+        self._max_batch_seen = 0
+        self._batch_size_counts = defaultdict(int)
+        self._queue_wait_total = 0.0
+        self._forward_time_total = 0.0
+
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def submit(self, window):
+        """Queue a single window and return a Future resolving to its output row."""
+        window = np.asarray(window, dtype=np.float32)
+        if window.ndim != 2:
+            raise ValueError(f"Expected a (timesteps, features) window, got shape {window.shape}")
+
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Inference batcher has been stopped")
+            self._pending.append((window, future, time.perf_counter()))
+            self._cond.notify()
+        return future
+
+    def predict(self, window, timeout=None):
+        """Blocking helper: submit a window and wait for its prediction."""
+        return self.submit(window).result(timeout=timeout)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._worker.join(timeout=1.0)
+
+    def get_stats(self):
+        with self._stats_lock:
+            batches = self._batches
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000.0, 3),
+                "batches": batches,
+                "forward_passes": self._forward_passes,
+                "windows": self._windows,
+                "avg_batch_size": round(self._windows / batches, 3) if batches else 0.0,
+                "max_batch_seen": self._max_batch_seen,
+                "batch_size_histogram": {str(k): v for k, v in sorted(self._batch_size_counts.items())},
+                "avg_queue_wait_ms": round(1000.0 * self._queue_wait_total / self._windows, 3) if self._windows else 0.0,
+                "avg_forward_ms": round(1000.0 * self._forward_time_total / self._forward_passes, 3) if self._forward_passes else 0.0,
+            }
+
+    # ------------------------------
+    # Worker
+    # ------------------------------
+    def _collect_batch(self):
+        with self._cond:
+            while not self._pending and not self._stopped:
+                self._cond.wait()
+            if self._stopped and not self._pending:
+                return None
+
+            # Give other sessions a short window to join this batch
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._stopped:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+
+            started = time.perf_counter()
+            buckets = defaultdict(list)
+            for item in batch:
+                buckets[item[0].shape].append(item)
+
+            for items in buckets.values():
+                inputs = np.stack([window for window, _, _ in items])
+                t0 = time.perf_counter()
+                try:
+                    outputs = np.asarray(self.predict_fn(inputs))
+                except Exception as e:
+                    for _, future, _ in items:
+                        future.set_exception(e)
+                    continue
+                finally:
+                    forward_time = time.perf_counter() - t0
+
+                for row, (_, future, _) in zip(outputs, items):
+                    future.set_result(row)
+
+                with self._stats_lock:
+                    self._forward_passes += 1
+                    self._forward_time_total += forward_time
+
+            with self._stats_lock:
+                self._batches += 1
+                self._windows += len(batch)
+                self._max_batch_seen = max(self._max_batch_seen, len(batch))
+                self._batch_size_counts[len(batch)] += 1
+                self._queue_wait_total += sum(started - queued for _, _, queued in batch)
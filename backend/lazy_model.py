@@ -0,0 +1,79 @@
+# lazy_model.py
+# Loads the prediction stack (TensorFlow, model.json + model.h5, MediaPipe) in
+# a background thread, so importing server.py is fast and the auth / static
+# routes answer while the model is still loading. Predict routes ask
+# ``get()`` and answer "warming up" until loading and warm-up are done.
+import threading
+import time
+
+
+class ModelNotReady(RuntimeError):
+    """The model is still loading / warming up (or failed to load)."""
+
+    def __init__(self, status):
+        super().__init__(f"Model is {status}")
+        self.status = status
+
+
+class LazyModel:
+    """Runs ``loader()`` (returns the predictor: model_handler or a worker pool),
+    then ``predictor.warmup()``, once, in a background thread.
+
+    ``status`` is "not started", "loading", "warming up", "ready" or "failed".
+    """
+
+    def __init__(self, loader, name="model-loader"):
+        self.loader = loader
+        self.name = name
+        self.status = "not started"
+        self.error = None
+        self.timings = {}          # phase -> seconds ("load", "warmup")
+        self._predictor = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def start(self):
+        """Start loading in the background (no-op when already started)."""
+        with self._lock:
+            if self._thread is None:
+                self.status = "loading"
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            started = time.perf_counter()
+            predictor = self.loader()
+            self.timings["load"] = time.perf_counter() - started
+            print(f"✅ Model loaded in {self.timings['load']:.1f}s")
+
+            self.status = "warming up"
+            self.timings["warmup"] = predictor.warmup()
+            print(f"✅ Warm-up finished in {self.timings['warmup']:.1f}s")
+            self._predictor = predictor
+            self.status = "ready"
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.status = "failed"
+            print(f"❌ Model failed to load: {self.error}")
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self._predictor is not None
+
+    def get(self):
+        """The loaded predictor; starts loading on first use and raises ModelNotReady until it is ready."""
+        if self._predictor is None:
+            self.start()
+            raise ModelNotReady(self.status)
+        return self._predictor
+
+    def wait(self, timeout=None):
+        """Block until loading has finished; returns the predictor (raises ModelNotReady on failure / timeout)."""
+        self.start()
+        self._done.wait(timeout)
+        return self.get()
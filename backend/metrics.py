@@ -0,0 +1,171 @@
+# metrics.py
+# Always-on metrics for the predict path: counters and fixed-bucket histograms
+# (one short lock per update), rendered in the Prometheus text
+# exposition format for GET /metrics.
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; covers everything from extract_keypoints (~20 µs) to a slow request
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def samples(self):
+        return [("", {}, self._value)]
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += seconds
+
+    def time(self):
+        """``with histogram.time(): ...`` observes the block's duration."""
+        return _Timer(self)
+
+    def samples(self):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        samples, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            samples.append(("_bucket", {"le": _format_bound(bound)}, cumulative))
+        samples.append(("_sum", {}, total))
+        samples.append(("_count", {}, cumulative))
+        return samples
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _Callback:
+    """Value read at scrape time, e.g. the number of live sessions."""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def samples(self):
+        value = self.fn()
+        if isinstance(value, list):
+            # [(labels dict, number), ...], e.g. one sample per detector
+            return [("", labels, v) for labels, v in value]
+        return [("", {}, value)]
+
+
+class MetricsRegistry:
+    """Named metric families; every family can have several label sets."""
+
+    def __init__(self, prefix="handsign_"):
+        self.prefix = prefix
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name, kind, help_text, labels, factory):
+        name = self.prefix + name
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = {"type": kind, "help": help_text, "children": {}}
+            child = family["children"].get(key)
+            if child is None:
+                child = family["children"][key] = factory()
+            return child
+
+    def counter(self, name, help_text, **labels):
+        return self._get(name, "counter", help_text, labels, Counter)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS, **labels):
+        return self._get(name, "histogram", help_text, labels, lambda: Histogram(buckets))
+
+    def callback(self, name, help_text, fn, kind="gauge", **labels):
+        """Metric computed at scrape time; ``fn()`` returns a number or [(labels dict, number), ...]."""
+        return self._get(name, kind, help_text, labels, lambda: _Callback(fn))
+
+    def collect(self):
+        """Plain-data snapshot (picklable, so worker processes can send it back)."""
+        with self._lock:
+            families = [(name, dict(f), list(f["children"].items())) for name, f in self._families.items()]
+        snapshot = []
+        for name, family, children in families:
+            samples = []
+            for key, child in children:
+                try:
+                    child_samples = child.samples()
+                except Exception:
+                    continue  # a failing callback must not break the scrape
+                for suffix, extra, value in child_samples:
+                    samples.append((suffix, dict(key, **extra), value))
+            snapshot.append({"name": name, "type": family["type"], "help": family["help"], "samples": samples})
+        return snapshot
+
+
+def render(snapshots):
+    """Prometheus text format for one snapshot, or a list of (extra labels, snapshot) pairs.
+
+    ``render(registry.collect())`` for a single process; worker pools pass
+    ``[({"worker": "0"}, snapshot0), ...]`` so each sample is labelled.
+    """
+    if snapshots and isinstance(snapshots[0], dict):
+        snapshots = [({}, snapshots)]
+    merged = {}
+    for extra, snapshot in snapshots:
+        for family in snapshot:
+            entry = merged.setdefault(family["name"], {"type": family["type"], "help": family["help"], "samples": []})
+            for suffix, labels, value in family["samples"]:
+                entry["samples"].append((suffix, dict(extra, **labels), value))
+
+    lines = []
+    for name, family in merged.items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for suffix, labels, value in family["samples"]:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                         else f"{name}{suffix} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -2,14 +2,22 @@
 import cv2
 import numpy as np
 import mediapipe as mp
-import base64
-import io
 import os
-import threading
-from PIL import Image, UnidentifiedImageError
-from keras.models import model_from_json
-from function import extract_keypoints, mediapipe_detection, actions
-from collections import deque
+import time
+from image_decode import decode_base64_image, decode_image_bytes
+from function import extract_keypoints, normalize_keypoints, actions, KEYPOINT_SIZE
+from inference_batcher import InferenceBatcher
+from hands_pool import HandsPool
+from inference_backends import load_keras_model, create_backend, NumpyBackend
+from streaming_inference import StreamingInference
+from metrics import MetricsRegistry
+from motion_gate import MotionGate
+from roi_tracker import RoiTracker
+from result_cache import ResultCache
+from sign_recognizer import (
+    THRESHOLD, MARGIN_THRESHOLD, SMOOTHING_WINDOW, STABILITY_RATIO, MIN_SEQUENCE_FOR_INFERENCE, SignRecognizer,
+)
+from session_store import SessionState, SessionStore, create_session_backend
 
 # ==============================
 # Load model once at startup
@@ -19,191 +27,447 @@ _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 _MODEL_JSON_PATH = os.path.join(_BASE_DIR, "model.json")
 _MODEL_WEIGHTS_PATH = os.path.join(_BASE_DIR, "model.h5")
 
-if not os.path.exists(_MODEL_JSON_PATH):
-    raise FileNotFoundError(f"model.json not found at {_MODEL_JSON_PATH}")
-
-with open(_MODEL_JSON_PATH, "r") as json_file:
-    model = model_from_json(json_file.read())
-
-if not os.path.exists(_MODEL_WEIGHTS_PATH):
-    # Surface a clear message; training/export may be required.
-    raise FileNotFoundError(
-        f"model.h5 not found at {_MODEL_WEIGHTS_PATH}. Ensure weights are exported next to model.json."
-    )
+model = load_keras_model(_MODEL_JSON_PATH, _MODEL_WEIGHTS_PATH)
 
-model.load_weights(_MODEL_WEIGHTS_PATH)
-print("✅ Model loaded successfully!")
+# Inference backend: "compiled" (tf.function), "numpy" (pure NumPy LSTM), "keras" (model.predict)
+# or "tflite". HANDSIGN_MODEL_EXPORT points numpy/tflite at an exported variant from export_model.py.
+INFERENCE_BACKEND = os.environ.get("HANDSIGN_INFERENCE_BACKEND", "compiled")
+MODEL_EXPORT_PATH = os.environ.get("HANDSIGN_MODEL_EXPORT") or None
+if MODEL_EXPORT_PATH and not os.path.isabs(MODEL_EXPORT_PATH):
+    MODEL_EXPORT_PATH = os.path.join(_BASE_DIR, MODEL_EXPORT_PATH)
+inference_backend = create_backend(INFERENCE_BACKEND, model, path=MODEL_EXPORT_PATH)
+print(f"✅ Model loaded successfully! (backend: {inference_backend.name})")
 
 # Mediapipe setup (tuned for better accuracy)
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    static_image_mode=False,
-    max_num_hands=1,
-    model_complexity=0,              # 0 for speed, 1 for accuracy; we'll auto-switch
-    min_detection_confidence=0.6,    # reduce false detections
-    min_tracking_confidence=0.6      # improve tracking stability
-)
 
-# Detection memory
-sequence_by_session = {}
-predictions_by_session = {}
-sentence_by_session = {}
-last_access_by_session = {}
-_calls_since_cleanup = 0
+
+def _create_hands():
+    return mp_hands.Hands(
+        static_image_mode=False,
+        max_num_hands=1,
+        model_complexity=0,              # 0 for speed, 1 for accuracy; we'll auto-switch
+        min_detection_confidence=0.6,    # reduce false detections
+        min_tracking_confidence=0.6      # improve tracking stability
+    )
+
+
+# ==============================
+# Metrics (GET /metrics)
+# ==============================
+metrics_registry = MetricsRegistry()
+_STAGES = ("decode", "resize", "detector_wait", "detect", "extract", "inference", "frame")
+_stage_seconds = {
+    stage: metrics_registry.histogram("stage_duration_seconds", "Time spent in each stage of the predict path",
+                                      stage=stage)
+    for stage in _STAGES
+}
+_frames_processed = metrics_registry.counter("frames_processed_total", "Frames run through hand detection")
+_hands_detected = metrics_registry.counter("hands_detected_total", "Frames in which a hand was detected")
+_keypoint_vectors = metrics_registry.counter("keypoint_vectors_total", "Client-side landmark vectors received")
+_inferences = metrics_registry.counter("inferences_total", "Model predictions run")
+_predictions_emitted = metrics_registry.counter("predictions_emitted_total",
+                                                "Confident, stable signs returned to clients")
+_prediction_errors = metrics_registry.counter("prediction_errors_total", "Model predictions that raised")
+_gated = {
+    reason: metrics_registry.counter("gated_total", "Requests answered with the session's previous result",
+                                     reason=reason)
+    for reason in ("frame", "keypoints")
+}
+_result_cache_lookups = {
+    outcome: metrics_registry.counter("result_cache_lookups_total", "Windowed-mode result cache lookups",
+                                      outcome=outcome)
+    for outcome in ("hit", "miss")
+}
+_roi_detections = {
+    outcome: metrics_registry.counter("roi_detections_total", "Detections run on the tracked hand crop",
+                                      outcome=outcome)
+    for outcome in ("hit", "lost")
+}
+
+
+def _observe_detection(waited, elapsed):
+    _stage_seconds["detector_wait"].observe(waited)
+    _stage_seconds["detect"].observe(elapsed)
+
+
+# Pool of detectors instead of one global Hands behind a lock; each session
+# sticks to one detector so tracking stays continuous.
+HANDS_POOL_SIZE = int(os.environ.get("HANDSIGN_HANDS_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+hands_pool = HandsPool(_create_hands, size=HANDS_POOL_SIZE, observer=_observe_detection)
 
 # Prediction and smoothing parameters
-threshold = 0.8               # slightly lower to avoid missing good preds
-margin_threshold = 0.10       # relax margin for sensitivity
-smoothing_window = 10         # larger window for stability
-stability_ratio = 0.7         # fraction of window that must agree
-min_sequence_for_inference = 24  # modest temporal context
+# (defaults shared with transcribe.py, see sign_recognizer.py)
+threshold = THRESHOLD
+margin_threshold = MARGIN_THRESHOLD
+smoothing_window = SMOOTHING_WINDOW
+stability_ratio = STABILITY_RATIO
+min_sequence_for_inference = MIN_SEQUENCE_FOR_INFERENCE
+window_length = 50            # frames kept per session (matches training)
+
+# Emit decisions; windows and votes live in the session backend
+recognizer = SignRecognizer(actions, threshold=threshold, margin_threshold=margin_threshold,
+                            smoothing_window=smoothing_window, stability_ratio=stability_ratio,
+                            min_sequence=min_sequence_for_inference, window_length=window_length,
+                            width=KEYPOINT_SIZE)
+
+# Session limits: idle sessions are dropped after HANDSIGN_SESSION_MAX_AGE
+# seconds; beyond HANDSIGN_MAX_SESSIONS (or HANDSIGN_SESSION_MEMORY_MB of
+# keypoint buffers) the least recently used session is dropped.
+SESSION_MAX_AGE = float(os.environ.get("HANDSIGN_SESSION_MAX_AGE", "1800"))
+MAX_SESSIONS = int(os.environ.get("HANDSIGN_MAX_SESSIONS", "10000"))
+SESSION_MEMORY_MB = float(os.environ.get("HANDSIGN_SESSION_MEMORY_MB", "0")) or None
+# Session backend: "memory" (this process) or "redis" (HANDSIGN_REDIS_URL), which
+# lets several server instances share sessions without sticky routing
+SESSION_BACKEND = os.environ.get("HANDSIGN_SESSION_BACKEND", "memory")
+REDIS_URL = os.environ.get("HANDSIGN_REDIS_URL", "redis://localhost:6379/0")
 
 # Downscale factor to reduce CPU cost when extracting landmarks
 DOWNSCALE_WIDTH = 320
 
-# Thread safety for Mediapipe + model inference
-_inference_lock = threading.Lock()
+# ROI tracking: detect on a padded crop around the previous frame's hand (full
+# resolution, capped at HANDSIGN_ROI_MAX_SIDE), full frame when the hand is lost
+ROI_TRACKING = os.environ.get("HANDSIGN_ROI_TRACKING", "1") != "0"
+roi_tracker = RoiTracker(
+    padding=float(os.environ.get("HANDSIGN_ROI_PADDING", "0.6")),
+    max_side=int(os.environ.get("HANDSIGN_ROI_MAX_SIDE", "256")),
+)
+
+# Client-side landmark mode: cap on vectors accepted per request
+MAX_KEYPOINT_BATCH = 50
+
+# Motion gating: an unchanged frame skips detection, a hand that has not moved
+# skips the LSTM; the session's previous result is returned instead.
+MOTION_GATING = os.environ.get("HANDSIGN_MOTION_GATING", "1") != "0"
+# Adaptive send rate: results carry "nextFrameMs", raised for idle / static sessions
+ADAPTIVE_SEND_RATE = os.environ.get("HANDSIGN_ADAPTIVE_RATE", "1") != "0"
+motion_gate = MotionGate(
+    frame_delta=float(os.environ.get("HANDSIGN_GATE_FRAME_DELTA", "3.0")),
+    keypoint_delta=float(os.environ.get("HANDSIGN_GATE_KEYPOINT_DELTA", "0.01")),
+    max_reuse=int(os.environ.get("HANDSIGN_GATE_MAX_REUSE", "4")),
+)
+
+# Result cache: windows within HANDSIGN_RESULT_CACHE_TOLERANCE (mean absolute
+# keypoint difference) of a recently predicted one reuse its probabilities
+# (windowed mode; HANDSIGN_RESULT_CACHE=0 disables it)
+RESULT_CACHE_SIZE = int(os.environ.get("HANDSIGN_RESULT_CACHE", "1024"))
+result_cache = ResultCache(
+    max_entries=RESULT_CACHE_SIZE,
+    tolerance=float(os.environ.get("HANDSIGN_RESULT_CACHE_TOLERANCE", "0.01")),
+    key_frames=int(os.environ.get("HANDSIGN_RESULT_CACHE_FRAMES", "5")),
+) if RESULT_CACHE_SIZE > 0 else None
+
+# Micro-batching: concurrent sessions share one model forward pass
+BATCH_MAX_SIZE = int(os.environ.get("HANDSIGN_BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("HANDSIGN_BATCH_MAX_WAIT_MS", "5"))
+
+_batcher = InferenceBatcher(
+    inference_backend.predict,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+)
+
+
+# Inference mode: "windowed" re-runs the LSTM over the whole buffer each frame,
+# "streaming" keeps per-session LSTM states and advances them one step per frame
+# (see streaming_inference.py for the re-sync semantics). At the default re-sync
+# interval of 10, streaming agreed with windowed mode on 95.4% of top-1 classes on
+# MP_Data with the trained model (max |Δp| 1.0); 1 reproduces windowed mode exactly.
+INFERENCE_MODE = os.environ.get("HANDSIGN_INFERENCE_MODE", "windowed")
+STREAM_RESYNC_INTERVAL = int(os.environ.get("HANDSIGN_STREAM_RESYNC_INTERVAL", "10"))
+
+_streaming = None
+if INFERENCE_MODE == "streaming":
+    numpy_backend = inference_backend if isinstance(inference_backend, NumpyBackend) else NumpyBackend.from_keras(model)
+    _streaming = StreamingInference(numpy_backend, window_length=window_length, resync_interval=STREAM_RESYNC_INTERVAL)
+elif INFERENCE_MODE != "windowed":
+    raise ValueError(f"Unknown HANDSIGN_INFERENCE_MODE '{INFERENCE_MODE}'; use 'windowed' or 'streaming'")
+
+
+def _new_session(session_id):
+    # With a shared backend the window lives there, not in the local state
+    local_window = window_length if SESSION_BACKEND == "memory" else 0
+    state = SessionState(session_id, local_window, KEYPOINT_SIZE, smoothing_window, len(actions))
+    if _streaming is not None:
+        state.stream_state = _streaming.new_state()
+    state.gate_state = motion_gate.new_state()   # also drives the send-rate hint
+    if ROI_TRACKING:
+        state.roi_state = roi_tracker.new_state()
+    return state
+
+
+# Detection memory (one SessionState per client, LRU order)
+sessions = SessionStore(
+    _new_session,
+    max_age_seconds=SESSION_MAX_AGE,
+    max_sessions=MAX_SESSIONS,
+    max_bytes=SESSION_MEMORY_MB * 1024 * 1024 if SESSION_MEMORY_MB else None,
+    on_evict=hands_pool.release_session,
+)
+session_backend = create_session_backend(SESSION_BACKEND, sessions, url=REDIS_URL, window_length=window_length,
+                                         width=KEYPOINT_SIZE, smoothing_window=smoothing_window,
+                                         num_classes=len(actions), ttl_seconds=SESSION_MAX_AGE)
+print(f"🔹 Session backend: {session_backend.name}")
+
+
+def get_inference_stats():
+    """Batch-size stats from the inference scheduler and Hands pool wait/detection times."""
+    return {
+        "batching": _batcher.get_stats(),
+        "hands_pool": hands_pool.get_stats(),
+        "result_cache": result_cache.get_stats() if result_cache is not None else None,
+    }
+
+
+# Batcher / pool stats and live sessions, read at scrape time
+metrics_registry.callback("active_sessions", "Sessions held in this process's session store", lambda: len(sessions))
+metrics_registry.callback("sessions_evicted_total", "Sessions dropped for being idle or over the session cap",
+                          lambda: sessions.evicted, kind="counter")
+metrics_registry.callback("session_buffer_bytes", "Memory held by session keypoint buffers",
+                          sessions.memory_bytes)
+metrics_registry.callback("result_cache_entries", "Windows held in the result cache",
+                          lambda: len(result_cache) if result_cache is not None else 0)
+metrics_registry.callback("batcher_batches_total", "Micro-batches run by the inference batcher",
+                          lambda: _batcher.get_stats()["batches"], kind="counter")
+metrics_registry.callback("batcher_windows_total", "Windows predicted through the inference batcher",
+                          lambda: _batcher.get_stats()["windows"], kind="counter")
+metrics_registry.callback("batcher_avg_batch_size", "Average windows per micro-batch",
+                          lambda: _batcher.get_stats()["avg_batch_size"])
+metrics_registry.callback("batcher_avg_queue_wait_seconds", "Average time a window waits for its batch",
+                          lambda: _batcher.get_stats()["avg_queue_wait_ms"] / 1000.0)
+metrics_registry.callback("detector_sessions", "Sessions pinned to each MediaPipe detector",
+                          lambda: [({"detector": str(i)}, n)
+                                   for i, n in enumerate(hands_pool.get_stats()["sessions_per_detector"])])
+
+
+def get_metrics():
+    """Metrics snapshot for ``metrics.render`` (plain data, so worker processes can return it)."""
+    return metrics_registry.collect()
+
 
 # ==============================
-# Helper: decode base64 image
+# Warm-up
 # ==============================
-def decode_base64_image(base64_str):
-    """Converts base64 image (from browser) to OpenCV BGR frame.
-    Tries PIL first; falls back to OpenCV if needed.
-    """
-    try:
-        header, b64 = base64_str.split(",", 1)
-    except ValueError:
-        b64 = base64_str
-        header = ""
+# Bundled sample with a hand: on a blank frame the palm detector finds nothing
+# and the landmark model would first run on a real request
+_WARMUP_IMAGE_PATH = os.path.join(_BASE_DIR, "Image", "A", "0.png")
 
-    image_data = base64.b64decode(b64)
-    # First try PIL (usually fastest)
-    try:
-        image = Image.open(io.BytesIO(image_data))
-        frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        return frame
-    except (UnidentifiedImageError, OSError):
-        pass
-
-    # Fallback: use OpenCV decoding
-    np_bytes = np.frombuffer(image_data, dtype=np.uint8)
-    frame = cv2.imdecode(np_bytes, cv2.IMREAD_COLOR)
+
+def _warmup_frame():
+    frame = cv2.imread(_WARMUP_IMAGE_PATH) if os.path.exists(_WARMUP_IMAGE_PATH) else None
     if frame is None:
-        raise ValueError("Unable to decode image data; ensure WebP/JPEG support is installed.")
-    return frame
+        print(f"⚠️ {_WARMUP_IMAGE_PATH} not found; warming up on a blank frame (landmark model stays cold)")
+        return np.zeros((240, 320, 3), dtype=np.uint8)
+    return _downscale(frame)
+
+
+def warmup():
+    """Run sample data through decoding, every detector (palm and landmark
+    models) and the model so real requests don't pay graph start-up /
+    tracing costs. Returns the seconds taken."""
+    started = time.perf_counter()
+    frame = _warmup_frame()
+    _, jpeg = cv2.imencode(".jpg", frame)
+    decode_image_bytes(jpeg.tobytes())
+    if hands_pool.warmup(frame) < hands_pool.size:
+        print("⚠️ Warm-up frame: no hand found by every detector; their landmark model stays cold")
+    for length in (min_sequence_for_inference, window_length):
+        _batcher.predict(np.zeros((length, KEYPOINT_SIZE), dtype=np.float32))
+    if _streaming is not None:
+        state = _streaming.new_state()
+        _streaming.resync(state, np.zeros((window_length, KEYPOINT_SIZE), dtype=np.float32))
+        _streaming.predict(state)
+    return time.perf_counter() - started
+
 
 # ==============================
 # Main Prediction Function
 # ==============================
-def _get_session_buffers(session_id):
-    if session_id not in sequence_by_session:
-        sequence_by_session[session_id] = deque(maxlen=50)
-        predictions_by_session[session_id] = deque(maxlen=smoothing_window)
-        sentence_by_session[session_id] = deque(maxlen=1)
-    last_access_by_session[session_id] = int(cv2.getTickCount())
-    return sequence_by_session[session_id], predictions_by_session[session_id], sentence_by_session[session_id]
-
-
-def _maybe_cleanup_sessions(max_age_seconds: int = 1800):
-    global _calls_since_cleanup
-    _calls_since_cleanup += 1
-    if _calls_since_cleanup % 100 != 0:
-        return
-
-    now_ticks = cv2.getTickCount()
-    freq = cv2.getTickFrequency()
-    expired = []
-    for sid, last in list(last_access_by_session.items()):
-        age_sec = (now_ticks - last) / freq
-        if age_sec > max_age_seconds:
-            expired.append(sid)
-    for sid in expired:
-        sequence_by_session.pop(sid, None)
-        predictions_by_session.pop(sid, None)
-        sentence_by_session.pop(sid, None)
-        last_access_by_session.pop(sid, None)
+def _with_send_hint(gate, result):
+    result = dict(result)
+    if ADAPTIVE_SEND_RATE:
+        result["nextFrameMs"] = motion_gate.send_interval(gate)
+    return result
 
 
 def predict_sign(base64_image, session_id="default"):
-    seq_buf, pred_buf, sent_buf = _get_session_buffers(session_id)
-    _maybe_cleanup_sessions()
+    """Prediction for a base64 data URL frame (JSON route)."""
+    with _stage_seconds["decode"].time():
+        frame = decode_base64_image(base64_image)
+    return predict_frame(frame, session_id=session_id)
+
 
-    frame = decode_base64_image(base64_image)
+def predict_image_bytes(image_bytes, session_id="default"):
+    """Prediction for raw encoded image bytes (binary/multipart/WebSocket routes)."""
+    with _stage_seconds["decode"].time():
+        frame = decode_image_bytes(image_bytes)
+    return predict_frame(frame, session_id=session_id)
 
+
+def _downscale(frame):
     # Optional downscale for faster landmark detection
     h, w = frame.shape[:2]
     scale = DOWNSCALE_WIDTH / float(w) if w > DOWNSCALE_WIDTH else 1.0
     if scale < 1.0:
-        frame_small = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
-    else:
-        frame_small = frame
+        return cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    return frame
 
-    # Wrap mediapipe + prediction in a lock for thread safety
-    with _inference_lock:
-        image, results = mediapipe_detection(frame_small, hands)
+
+def predict_frame(frame, session_id="default"):
+    with _stage_seconds["frame"].time():
+        session = session_backend.get(session_id)
+        # Gate, ROI and detector tracking state are per session as well: one frame at a time
+        with session.lock:
+            return _predict_frame_locked(frame, session, session_id)
+
+
+def _predict_frame_locked(frame, session, session_id):
+    # With ROI tracking, the crop around last frame's hand replaces the
+    # downscaled full frame (the full frame is only used when tracking is lost)
+    roi = session.roi_state
+    with _stage_seconds["resize"].time():
+        cropped = roi_tracker.crop(roi, frame) if roi is not None else None
+        frame_small = _downscale(frame) if cropped is None else None
+
+    if MOTION_GATING:
+        gate = session.gate_state
+        window_ready = session.window_size >= min_sequence_for_inference
+        if motion_gate.frame_unchanged(gate, cropped[0] if cropped is not None else frame_small, window_ready):
+            _gated["frame"].inc()
+            return _with_send_hint(gate, gate.last_result)
+
+    # Detector checked out from the pool (per-session affinity)
+    results = None
+    if cropped is not None:
+        crop, box = cropped
+        _, results = hands_pool.detect(crop, session_id, region=box)
+        if roi_tracker.update(roi, results, frame.shape, box) is not None:
+            _roi_detections["hit"].inc()
+        else:
+            _roi_detections["lost"].inc()
+            results = None
+    if results is None:
+        if frame_small is None:
+            with _stage_seconds["resize"].time():
+                frame_small = _downscale(frame)
+        image, results = hands_pool.detect(frame_small, session_id, region="full" if roi is not None else None)
+        if roi is not None:
+            roi_tracker.update(roi, results, frame.shape)
+    _frames_processed.inc()
 
     # Only append when a hand is detected to avoid noisy zeros
     if results and getattr(results, 'multi_hand_landmarks', None):
-        keypoints = extract_keypoints(results)
-        seq_buf.append(keypoints)
+        _hands_detected.inc()
+        with _stage_seconds["extract"].time():
+            keypoints_list = [extract_keypoints(results)]
     else:
-        # No hand detected – clear short-term vote history
-        pred_buf.clear()
+        keypoints_list = []
+
+    return _predict_locked(session, keypoints_list)
+
+
+def predict_keypoints(keypoints, session_id="default"):
+    """Prediction from client-side landmarks (MediaPipe running in the browser).
+
+    ``keypoints`` is one 63-float vector (21 landmarks × x, y, z) or a batch of
+    them, in the same layout ``extract_keypoints`` produces. Vectors are
+    min-max normalized here exactly like server-side extraction. An empty
+    batch means no hand was detected.
+    """
+    vectors = validate_keypoints(keypoints)
+    _keypoint_vectors.inc(len(vectors))
+    return _predict_from_keypoints(session_backend.get(session_id), [normalize_keypoints(v) for v in vectors],
+                                   client_landmarks=True)
+
+
+def validate_keypoints(keypoints):
+    """Returns an (n, 63) float32 array or raises ValueError."""
+    try:
+        vectors = np.asarray(keypoints, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError("keypoints must be numeric")
+    if vectors.size == 0:
+        return vectors.reshape(0, KEYPOINT_SIZE)
+    if vectors.ndim == 1:
+        vectors = vectors[np.newaxis]
+    if vectors.ndim != 2 or vectors.shape[1] != KEYPOINT_SIZE:
+        raise ValueError(f"keypoints must have shape ({KEYPOINT_SIZE},) or (n, {KEYPOINT_SIZE}); got {vectors.shape}")
+    if vectors.shape[0] > MAX_KEYPOINT_BATCH:
+        raise ValueError(f"At most {MAX_KEYPOINT_BATCH} keypoint vectors per request")
+    if not np.all(np.isfinite(vectors)):
+        raise ValueError("keypoints must be finite numbers")
+    return vectors
+
+
+def _predict_from_keypoints(session, keypoints_list, client_landmarks=False):
+    # One request per session at a time: update, inference and vote work on
+    # the session's ring buffer in place
+    with session.lock:
+        return _predict_locked(session, keypoints_list, client_landmarks)
+
+
+def _predict_locked(session, keypoints_list, client_landmarks=False):
+    # Appends the new vectors (no hand: clears short-term vote history) and
+    # returns the session's window, oldest frame first
+    window = session_backend.update(session, keypoints_list)
+    if _streaming is not None:
+        for i, keypoints in enumerate(keypoints_list):
+            upto = len(window) - (len(keypoints_list) - 1 - i)
+            _streaming.step(session.stream_state, keypoints,
+                            lambda upto=upto: window[max(0, upto - window_length):upto])
+
+    gate = session.gate_state
+    window_ready = len(window) >= min_sequence_for_inference
+    # Client-side landmarks have no frame to compare, so hand movement drives the static send-rate hint
+    if MOTION_GATING and keypoints_list and motion_gate.keypoints_unchanged(
+            gate, keypoints_list[-1], window_ready, count_static=client_landmarks):
+        _gated["keypoints"].inc()
+        return _with_send_hint(gate, gate.last_result)
 
     sign_output = "Processing..."
     confidence = 0.0
+    inferred = False
 
     # Only infer when we have enough temporal context
-    if len(seq_buf) >= min_sequence_for_inference:
+    if window_ready:
         try:
             # Use last up to 50 frames to match training distribution
-            input_seq = np.expand_dims(np.array(list(seq_buf)), axis=0)
-            res = model.predict(input_seq, verbose=0)[0]
-
-            top_idx = int(np.argmax(res))
-            top_prob = float(res[top_idx])
-            # Get second best probability
-            if len(res) > 1:
-                second_prob = float(np.partition(res, -2)[-2])
-            else:
-                second_prob = 0.0
+            with _stage_seconds["inference"].time():
+                # (memory backend: ``window`` is a view of the ring buffer, no per-frame copy)
+                if _streaming is not None:
+                    res, cached = _streaming.predict(session.stream_state), False
+                elif result_cache is not None:
+                    res, cached = result_cache.predict(window, _batcher.predict)
+                    _result_cache_lookups["hit" if cached else "miss"].inc()
+                else:
+                    res, cached = _batcher.predict(window), False
+            if not cached:
+                _inferences.inc()
+            inferred = True
+
+            top_idx, top_prob, confident = recognizer.rank(res)
 
             # Update recent predictions window
-            pred_buf.append(top_idx)
-
-            # Compute stability in the voting window
-            from collections import Counter
-            if pred_buf:
-                counts = Counter(list(pred_buf))
-                most_common_idx, most_common_count = counts.most_common(1)[0]
-            else:
-                most_common_idx, most_common_count = top_idx, 0
-
-            required_count = max(1, int(np.ceil(stability_ratio * max(1, len(pred_buf)))))
+            votes = session_backend.add_vote(session, top_idx)
 
-            is_confident = (top_prob >= threshold) and ((top_prob - second_prob) >= margin_threshold)
-            is_stable_vote = (most_common_idx == top_idx) and (most_common_count >= required_count)
-
-            if is_confident and is_stable_vote:
+            if confident and recognizer.is_stable(top_idx, votes):
                 predicted_action = actions[top_idx]
                 confidence = round(top_prob, 2)
 
-                if len(sent_buf) == 0 or predicted_action != sent_buf[-1]:
-                    sent_buf.append(predicted_action)
+                # Keep only the most recent finalized sign
+                if predicted_action != session.last_sign:
+                    session_backend.set_last_sign(session, predicted_action)
 
                 sign_output = predicted_action
-
-            # Keep only the most recent finalized sign in sentence
-            if len(sent_buf) > 1:
-                # deque maxlen=1 already caps, but keep logic explicit
-                while len(sent_buf) > 1:
-                    sent_buf.popleft()
+                _predictions_emitted.inc()
         except Exception as e:
             print(f"⚠️ Prediction error: {e}")
+            _prediction_errors.inc()
             sign_output = "Error"
 
-    return {
+    result = {
         "sign": sign_output,
         "confidence": round(confidence, 2)
     }
+    motion_gate.remember(gate, result, keypoints_list[-1] if keypoints_list else None, inferred=inferred)
+    return _with_send_hint(gate, result)
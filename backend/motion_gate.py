@@ -0,0 +1,112 @@
+# motion_gate.py
+# Skips redundant work for sessions whose input has not changed: a frame that
+# looks like the previous one skips detection, landmarks that barely moved
+# skip the LSTM, and the last result is returned instead. Idle sessions are
+# told to send frames less often.
+import cv2
+import numpy as np
+
+# Thumbnail used for the frame comparison (cheap, and blurs away sensor noise)
+THUMBNAIL_SIZE = (32, 24)
+
+
+class GateState:
+    """Per-session gating memory."""
+    __slots__ = ("thumbnail", "keypoints", "last_result", "last_had_hand", "reused",
+                 "static_frames", "no_hand_frames")
+
+    def __init__(self):
+        self.thumbnail = None
+        self.keypoints = None
+        self.last_result = None
+        self.last_had_hand = False
+        self.reused = 0            # consecutive results served from the cache
+        self.static_frames = 0     # consecutive frames without meaningful change
+        self.no_hand_frames = 0    # consecutive frames without a hand
+
+
+class MotionGate:
+    """Decides when a session's previous result can be reused.
+
+    - ``frame_delta``: mean absolute difference (0–255) between 32×24
+      thumbnails below which a frame counts as unchanged
+    - ``keypoint_delta``: mean absolute difference between normalized
+      keypoint vectors below which the hand counts as not moving
+    - ``max_reuse``: at most this many results in a row are reused, so a
+      still session is still re-evaluated regularly
+    - ``send_interval_ms`` / ``idle_interval_ms`` / ``static_interval_ms``:
+      the send-rate hint returned to the client; sessions with no hand for
+      ``idle_after`` frames get the idle interval, unchanged ones the static one
+    """
+
+    def __init__(self, frame_delta=3.0, keypoint_delta=0.01, max_reuse=4, send_interval_ms=250,
+                 static_interval_ms=500, idle_interval_ms=1000, idle_after=8):
+        self.frame_delta = frame_delta
+        self.keypoint_delta = keypoint_delta
+        self.max_reuse = max_reuse
+        self.send_interval_ms = send_interval_ms
+        self.static_interval_ms = static_interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.idle_after = idle_after
+
+    def new_state(self):
+        return GateState()
+
+    def frame_unchanged(self, state, frame, window_ready):
+        """Compare ``frame`` with the session's previous frame; True means the cached result can be reused.
+
+        Only gates when the previous frame had no hand or the session already
+        has a full window, so a session never stalls while filling its window.
+        """
+        thumbnail = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+        previous, state.thumbnail = state.thumbnail, thumbnail
+        if previous is None or previous.shape != thumbnail.shape or state.last_result is None:
+            return False
+        if float(np.mean(np.abs(thumbnail - previous))) >= self.frame_delta:
+            state.static_frames = 0
+            return False
+        state.static_frames += 1
+        if state.last_had_hand and not window_ready:
+            return False
+        return self._try_reuse(state)
+
+    def keypoints_unchanged(self, state, keypoints, window_ready, count_static=False):
+        """True when the hand has not moved since the last model call and its result can be reused.
+
+        ``count_static``: hand movement also drives the static send-rate hint
+        (client-side landmarks, where there is no frame to compare).
+        """
+        previous = state.keypoints
+        moved = previous is None or float(np.mean(np.abs(keypoints - previous))) >= self.keypoint_delta
+        if count_static:
+            state.static_frames = 0 if moved else state.static_frames + 1
+        if moved or not window_ready or state.last_result is None or not state.last_had_hand:
+            return False
+        return self._try_reuse(state)
+
+    def _try_reuse(self, state):
+        if state.reused >= self.max_reuse:
+            return False
+        state.reused += 1
+        if not state.last_had_hand:
+            state.no_hand_frames += 1
+        return True
+
+    def remember(self, state, result, keypoints=None, inferred=False):
+        """Record a freshly computed result (``keypoints`` is the newest vector, None if no hand)."""
+        state.last_result = result
+        state.reused = 0
+        state.last_had_hand = keypoints is not None
+        state.no_hand_frames = 0 if keypoints is not None else state.no_hand_frames + 1
+        if inferred:
+            state.keypoints = np.array(keypoints, dtype=np.float32)
+        elif keypoints is None:
+            state.keypoints = None
+
+    def send_interval(self, state):
+        """Client send-rate hint in milliseconds."""
+        if state.no_hand_frames >= self.idle_after:
+            return self.idle_interval_ms
+        if state.static_frames >= self.idle_after:
+            return self.static_interval_ms
+        return self.send_interval_ms
@@ -0,0 +1,137 @@
+# result_cache.py
+# Bounded LRU cache in front of the model. A keypoint window is keyed by a
+# quantized hash of its newest frames; a lookup that lands on a stored window
+# within ``tolerance`` (mean absolute difference, keypoints are min-max
+# normalized to [0, 1]) reuses its probability vector instead of running the
+# LSTM. Catches poses held for seconds, across frames and sessions, beyond the
+# motion gate's short reuse streaks.
+#
+#   python result_cache.py     # check: cached predictions vs. fresh model output
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ResultCache:
+    """Window -> probability vector.
+
+    - ``max_entries``: LRU bound (each entry keeps its window, ~12.6 KB)
+    - ``tolerance``: largest mean absolute keypoint difference between a
+      stored window and a query that still reuses the stored result
+    - ``key_frames`` / ``key_step``: the key is the mean of the newest
+      ``key_frames`` frames quantized to ``key_step``. Coarse on purpose: the
+      key only finds the candidate and the tolerance check decides, so
+      landmark jitter rarely pushes a held pose into another bucket.
+    """
+
+    def __init__(self, max_entries=1024, tolerance=0.01, key_frames=5, key_step=0.1):
+        self.max_entries = max(1, int(max_entries))
+        self.tolerance = float(tolerance)
+        self.key_frames = max(1, int(key_frames))
+        self.key_step = float(key_step)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, window):
+        recent = np.asarray(window[-self.key_frames:], dtype=np.float32).mean(axis=0)
+        quantized = np.floor(recent / self.key_step).astype(np.int16)
+        # Length is part of the key: a filling window is a different model input
+        return len(window), hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+
+    def lookup(self, key, window):
+        """Stored probabilities for a window within tolerance of ``window``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and float(np.mean(np.abs(entry[0] - window))) <= self.tolerance:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def store(self, key, window, probs):
+        # Copies: ``window`` is usually a view into a session's ring buffer
+        entry = (np.array(window, dtype=np.float32), np.array(probs, dtype=np.float32))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def predict(self, window, predict_fn):
+        """Cached ``predict_fn(window)``; returns (probs, hit)."""
+        key = self.key(window)
+        probs = self.lookup(key, window)
+        if probs is not None:
+            return probs, True
+        probs = predict_fn(window)
+        self.store(key, window, probs)
+        return probs, False
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "tolerance": self.tolerance,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# ==============================
+# Check: cached vs fresh predictions
+# ==============================
+def check_cache(backend, windows, tolerance=0.01, jitter=0.5, seed=0):
+    """Replays every window as a held pose: the same window with per-coordinate
+    noise of up to ``jitter * tolerance``. On each cache hit, the cached vector
+    is compared with the model's output for the jittered window.
+
+    Returns (hits, lookups, max |Δprob|, top-class agreement on hits).
+    """
+    rng = np.random.default_rng(seed)
+    cache = ResultCache(max_entries=len(windows) + 1, tolerance=tolerance)
+    hits, worst, agree = 0, 0.0, 0
+    for window in windows:
+        cache.predict(window, lambda w: backend.predict(w[np.newaxis])[0])
+        held = (window + rng.uniform(-jitter, jitter, window.shape) * tolerance).astype(np.float32)
+        cached, hit = cache.predict(held, lambda w: backend.predict(w[np.newaxis])[0])
+        if hit:
+            fresh = backend.predict(held[np.newaxis])[0]
+            hits += 1
+            worst = max(worst, float(np.max(np.abs(cached - fresh))))
+            agree += int(np.argmax(cached) == np.argmax(fresh))
+    return hits, len(windows), worst, (agree / hits if hits else 1.0)
+
+
+if __name__ == "__main__":
+    from dataset import packed_exists, load_packed
+    from function import KEYPOINT_SIZE, sequence_length
+    from inference_backends import CompiledBackend, load_check_model
+
+    model = load_check_model(os.path.dirname(os.path.abspath(__file__)))
+    backend = CompiledBackend(model)
+    if packed_exists():
+        X, _, _ = load_packed(mmap=True)
+        windows = np.asarray(X[np.random.default_rng(0).choice(len(X), min(200, len(X)), replace=False)],
+                             dtype=np.float32)
+    else:
+        windows = np.random.default_rng(0).random((200, sequence_length, KEYPOINT_SIZE), dtype=np.float32)
+
+    prob_tolerance = 0.02
+    hits, lookups, worst, agreement = check_cache(backend, windows)
+    ok = worst <= prob_tolerance and agreement == 1.0
+    print(f"{'✅' if ok else '❌'} {hits}/{lookups} held poses served from the cache; "
+          f"max |Δprob| {worst:.2e} (limit {prob_tolerance}), top-class agreement {agreement:.2%}")
+    sys.exit(0 if ok else 1)
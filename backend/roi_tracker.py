@@ -0,0 +1,112 @@
+# roi_tracker.py
+# Per-session region of interest: a padded box around the previous frame's
+# hand landmarks. Detection runs on that crop of the full-resolution frame (so
+# a small hand in a large webcam frame keeps its detail) and falls back to the
+# whole frame when the hand is lost.
+#
+# Keypoints are min-max normalized per axis (function.normalize_keypoints), so
+# they come out the same whether the landmarks were found in a crop or in the
+# full frame.
+import cv2
+
+
+class RoiState:
+    """Per-session ROI memory; ``box`` is (x0, y0, x1, y1) in full-frame pixels, or None."""
+    __slots__ = ("box", "hits", "misses")
+
+    def __init__(self):
+        self.box = None
+        self.hits = 0
+        self.misses = 0
+
+
+class RoiTracker:
+    """Computes crops from the previous landmarks and maps new landmarks back.
+
+    - ``padding``: margin added on every side, as a fraction of the hand's
+      larger side (the hand moves between frames)
+    - ``min_side``: smallest crop in pixels
+    - ``max_side``: crops larger than this are downscaled before detection
+
+    The box only moves when the hand gets close to its edge or changes size a
+    lot. A tracking-mode (``static_image_mode=False``) detector keeps its own
+    ROI in image coordinates, so it has to be reset whenever the region it is
+    fed changes (``HandsPool.detect(..., region=box)``); a steady box keeps
+    those resets, and the extra palm detection they cost, rare.
+    """
+
+    def __init__(self, padding=0.6, min_side=96, max_side=256):
+        self.padding = padding
+        self.min_side = min_side
+        self.max_side = max_side
+
+    def new_state(self):
+        return RoiState()
+
+    def crop(self, state, frame):
+        """Returns (crop, box) for the session's ROI, or None when there is nothing to track."""
+        if state.box is None:
+            return None
+        x0, y0, x1, y1 = state.box
+        crop = frame[y0:y1, x0:x1]
+        if crop.size == 0:
+            return None
+        side = max(crop.shape[:2])
+        if side > self.max_side:
+            scale = self.max_side / float(side)
+            # INTER_LINEAR: the ratio is small and INTER_AREA costs ~7x more on odd sizes
+            crop = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))),
+                              interpolation=cv2.INTER_LINEAR)
+        return crop, state.box
+
+    def update(self, state, results, frame_shape, box=None):
+        """Track the hand found in ``results``.
+
+        ``box`` is the crop the detection ran on (None for the full frame);
+        landmarks are normalized to that region. Returns the ROI for the next
+        frame, or None when there is no hand: the ROI is dropped and the
+        caller falls back to the full frame.
+        """
+        hand = _first_hand(results)
+        if hand is None:
+            if box is not None:
+                state.misses += 1
+            state.box = None
+            return None
+
+        height, width = frame_shape[:2]
+        bx0, by0, bx1, by1 = box if box is not None else (0, 0, width, height)
+        xs = [bx0 + lm.x * (bx1 - bx0) for lm in hand.landmark]
+        ys = [by0 + lm.y * (by1 - by0) for lm in hand.landmark]
+        hand_box = (min(xs), min(ys), max(xs), max(ys))
+        if box is not None:
+            state.hits += 1
+
+        if state.box is None or not self._still_fits(state.box, hand_box, width, height):
+            state.box = self._box_around(hand_box, width, height)
+        return state.box
+
+    def _still_fits(self, box, hand_box, width, height):
+        """Hand well inside the box (box edges on the frame border don't count) and not much smaller."""
+        hand_side = max(hand_box[2] - hand_box[0], hand_box[3] - hand_box[1])
+        box_side = max(box[2] - box[0], box[3] - box[1])
+        margin = 0.25 * self.padding * hand_side
+        inside = ((box[0] == 0 or hand_box[0] - box[0] >= margin)
+                  and (box[1] == 0 or hand_box[1] - box[1] >= margin)
+                  and (box[2] == width or box[2] - hand_box[2] >= margin)
+                  and (box[3] == height or box[3] - hand_box[3] >= margin))
+        return inside and hand_side * (1.0 + 2.0 * self.padding) >= 0.6 * box_side
+
+    def _box_around(self, hand_box, width, height):
+        # Square box around the hand, padded and clipped to the frame
+        cx, cy = (hand_box[0] + hand_box[2]) / 2.0, (hand_box[1] + hand_box[3]) / 2.0
+        side = max(hand_box[2] - hand_box[0], hand_box[3] - hand_box[1]) * (1.0 + 2.0 * self.padding)
+        half = max(side, self.min_side) / 2.0
+        x0, y0 = max(0, int(cx - half)), max(0, int(cy - half))
+        x1, y1 = min(width, int(cx + half)), min(height, int(cy + half))
+        return (x0, y0, x1, y1) if x1 - x0 > 1 and y1 - y0 > 1 else None
+
+
+def _first_hand(results):
+    hands = getattr(results, "multi_hand_landmarks", None) if results else None
+    return hands[0] if hands else None
@@ -0,0 +1,97 @@
+# serve.py
+# Production entry point for server.app: no debug reloader (the model is
+# loaded once per process, not twice) and a warm-up pass before traffic.
+#
+#   python serve.py [--server gunicorn|waitress] [--host 0.0.0.0] [--port 5000] [--workers 1] [--threads 8]
+#
+# gunicorn (Linux/macOS): --workers processes with --threads threads each.
+#   Every worker imports the app after the fork and warms up before it
+#   accepts connections. More than one worker needs
+#   HANDSIGN_SESSION_BACKEND=redis: with the memory backend each worker has
+#   its own sessions and nothing routes a client to the same worker, so one
+#   browser's frames would be split across windows. (HANDSIGN_WORKERS=N
+#   scales one gunicorn worker over N model processes with session routing.)
+#   The app is deliberately not preloaded in the
+#   master: TensorFlow hangs and MediaPipe aborts in a child forked after
+#   they were initialised, so model sharing across workers goes through
+#   HANDSIGN_WORKERS (spawned processes) instead of fork.
+# waitress (Windows, or when gunicorn is not installed): one process with
+#   --threads threads; warm-up runs in the background and GET /api/ready
+#   answers 503 until it is done.
+import argparse
+import os
+import sys
+
+
+def run_gunicorn(host, port, workers, threads, timeout):
+    from gunicorn.app.base import BaseApplication
+
+    def post_worker_init(worker):
+        import server
+        try:
+            server.model.wait()  # accept connections only once the model is warmed up
+        except server.ModelNotReady:
+            worker.log.error("Model failed to load: %s", server.model.error)
+        worker.log.info("Model %s (%s)", server.model.status,
+                        ", ".join(f"{k} {v:.1f}s" for k, v in server.startup_timings().items()))
+
+    class HandSignApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", threads)
+            self.cfg.set("timeout", timeout)
+            self.cfg.set("preload_app", False)
+            self.cfg.set("post_worker_init", post_worker_init)
+
+        def load(self):
+            from server import app
+            return app
+
+    HandSignApplication().run()
+
+
+def run_waitress(host, port, threads):
+    from waitress import serve
+    import server
+
+    server.model.start()  # loads and warms up in the background; /api/ready reports 503 until done
+    serve(server.app, host=host, port=port, threads=threads)
+
+
+def default_server():
+    if sys.platform != "win32":
+        try:
+            import gunicorn  # noqa: F401
+            return "gunicorn"
+        except ImportError:
+            pass
+    return "waitress"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the HandSign backend in production")
+    parser.add_argument("--server", choices=("gunicorn", "waitress"), default=None)
+    parser.add_argument("--host", default=os.environ.get("HANDSIGN_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("HANDSIGN_PORT", "5000")))
+    shared_sessions = os.environ.get("HANDSIGN_SESSION_BACKEND", "memory") == "redis"
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("HANDSIGN_SERVE_WORKERS", "2" if shared_sessions else "1")),
+                        help="gunicorn worker processes (each loads its own model); more than 1 requires "
+                             "HANDSIGN_SESSION_BACKEND=redis, since workers do not share in-memory sessions")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("HANDSIGN_SERVE_THREADS", "8")),
+                        help="request threads per process")
+    parser.add_argument("--timeout", type=int, default=120, help="gunicorn worker timeout in seconds")
+    args = parser.parse_args()
+
+    name = args.server or default_server()
+    if name == "gunicorn" and args.workers > 1 and not shared_sessions:
+        parser.error(f"--workers {args.workers} needs HANDSIGN_SESSION_BACKEND=redis: with in-memory sessions a "
+                     "client's frames would be split across workers. Use --workers 1 (optionally with "
+                     "HANDSIGN_WORKERS=N model processes) or configure Redis.")
+    print(f"🔹 Serving on {args.host}:{args.port} with {name}")
+    if name == "gunicorn":
+        run_gunicorn(args.host, args.port, args.workers, args.threads, args.timeout)
+    else:
+        run_waitress(args.host, args.port, args.threads)
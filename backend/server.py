@@ -1,19 +1,59 @@
 # ==============================
 # server.py
 # ==============================
-from flask import Flask, request, jsonify, send_from_directory
+import time
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 from db import create_user_table, register_user, get_connection
+from lazy_model import LazyModel, ModelNotReady
+from metrics import MetricsRegistry, render as render_metrics
 import os
+import json
 import webbrowser
 import threading
 
+try:
+    from flask_sock import Sock  # optional: enables the /ws/predict stream
+except ImportError:
+    Sock = None
+
 # Initialize Flask app
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
 CORS(app)
 
-# Import model handler after app init
-from model_handler import predict_sign
+# Prediction runs in-process by default; HANDSIGN_WORKERS=N moves MediaPipe and
+# the model into N worker processes fed through shared memory.
+WORKERS = int(os.environ.get("HANDSIGN_WORKERS", "0"))
+# "background": start loading the model as soon as the server is imported;
+# "on_demand": at the first predict request. Predict routes answer 503
+# "warming up" until the model is loaded and warmed up.
+MODEL_LOADING = os.environ.get("HANDSIGN_MODEL_LOADING", "background")
+worker_pool = None
+
+
+def _load_predictor():
+    """Imports TensorFlow / MediaPipe; runs in the LazyModel thread, never at import time."""
+    global worker_pool
+    if WORKERS > 0:
+        import atexit
+        from worker_pool import ProcessWorkerPool
+
+        worker_pool = ProcessWorkerPool(WORKERS)
+        atexit.register(worker_pool.close)
+        return worker_pool
+    import model_handler
+    return model_handler
+
+
+model = LazyModel(_load_predictor)
+
+# Startup timings for GET /metrics (the predictor's own metrics only exist once it is loaded)
+server_metrics = MetricsRegistry()
+server_metrics.callback("startup_seconds", "Time spent importing the server, loading and warming up the model",
+                        lambda: [({"phase": phase}, seconds) for phase, seconds in startup_timings().items()])
+server_metrics.callback("model_ready", "1 once the model is loaded and warmed up", lambda: int(model.ready))
 
 # Ensure table exists at server start
 create_user_table()
@@ -22,6 +62,20 @@ create_user_table()
 # ==============================
 # AI Prediction Route
 # ==============================
+@app.errorhandler(ModelNotReady)
+def model_not_ready(e):
+    if e.status == "failed":
+        return jsonify({"status": "failed", "error": f"Model failed to load: {model.error}"}), 500
+    if e.status == "unavailable":
+        # HANDSIGN_WORKERS: the session's worker process died or timed out
+        response = jsonify({"status": "unavailable", "error": str(e), "nextFrameMs": 1000})
+    else:
+        response = jsonify({"status": "warming up", "error": "Model is warming up, retry shortly",
+                            "nextFrameMs": 1000})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
 @app.route('/api/predict', methods=['POST'])
 def predict():
     data = request.get_json() or {}
@@ -31,13 +85,121 @@ def predict():
     if not image_data:
         return jsonify({"error": "No image provided"}), 400
 
+    predictor = model.get()
     try:
-        result = predict_sign(image_data, session_id=session_id)
+        result = predictor.predict_sign(image_data, session_id=session_id)
         return jsonify(result)
+    except ModelNotReady:
+        raise  # worker unavailable: 503 from model_not_ready
     except Exception as e:
         return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
 
+@app.route('/api/predict/frame', methods=['POST'])
+def predict_frame_route():
+    """Binary frame upload: raw image/* body or multipart field 'frame'."""
+    session_id = (request.args.get('sessionId')
+                  or request.headers.get('X-Session-Id')
+                  or request.form.get('sessionId')
+                  or 'default')
+
+    if request.mimetype.startswith('image/') or request.mimetype == 'application/octet-stream':
+        image_bytes = request.get_data(cache=False)
+    elif 'frame' in request.files:
+        image_bytes = request.files['frame'].read()
+    else:
+        return jsonify({"error": "Send image/* bytes or a multipart 'frame' file"}), 415
+
+    if not image_bytes:
+        return jsonify({"error": "No image provided"}), 400
+
+    predictor = model.get()
+    try:
+        result = predictor.predict_image_bytes(image_bytes, session_id=session_id)
+        return jsonify(result)
+    except ModelNotReady:
+        raise  # worker unavailable: 503 from model_not_ready
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+
+
+@app.route('/api/predict/keypoints', methods=['POST'])
+def predict_keypoints_route():
+    """Client-side landmark mode: JSON {"keypoints": [63 floats] or [[63 floats], ...]}."""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Send a JSON object with 'keypoints'"}), 400
+    session_id = data.get('sessionId') or 'default'
+
+    if 'keypoints' not in data:
+        return jsonify({"error": "No keypoints provided"}), 400
+
+    predictor = model.get()
+    try:
+        result = predictor.predict_keypoints(data['keypoints'], session_id=session_id)
+        return jsonify(result)
+    except ModelNotReady:
+        raise  # worker unavailable: 503 from model_not_ready
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+
+
+if Sock is not None:
+    sock = Sock(app)
+
+    @sock.route('/ws/predict')
+    def predict_stream(ws):
+        """One WebSocket per session: binary messages are frames, replies are JSON results."""
+        session_id = request.args.get('sessionId') or 'default'
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            if isinstance(message, str):
+                ws.send(json.dumps({"error": "Send frames as binary messages"}))
+                continue
+            try:
+                result = model.get().predict_image_bytes(message, session_id=session_id)
+            except ModelNotReady as e:
+                result = {"status": e.status, "error": f"Model is {e.status}", "nextFrameMs": 1000}
+            except Exception as e:
+                result = {"error": f"Prediction failed: {str(e)}"}
+            ws.send(json.dumps(result))
+
+
+@app.route('/api/predict/stats', methods=['GET'])
+def predict_stats():
+    return jsonify(model.get().get_inference_stats())
+
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 once the model and detectors have been warmed up, 503 before."""
+    if MODEL_LOADING == "on_demand":
+        model.start()
+    body = {"ready": model.ready, "status": model.status,
+            "startup_seconds": {k: round(v, 3) for k, v in startup_timings().items()}}
+    if model.error:
+        body["error"] = model.error
+    return jsonify(body), 200 if model.ready else 503
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms and predict-path counters."""
+    snapshots = [({}, server_metrics.collect())]
+    if model.ready:
+        predictor_metrics = model.get().get_metrics()
+        # model_handler returns one snapshot, a worker pool [(labels, snapshot), ...]
+        snapshots += [({}, predictor_metrics)] if predictor_metrics and isinstance(predictor_metrics[0], dict) \
+            else predictor_metrics
+    return Response(render_metrics(snapshots), mimetype='text/plain; version=0.0.4')
+
+
 # ==============================
 # API ROUTES
 # ==============================
@@ -143,9 +305,22 @@ def open_browser():
     webbrowser.open_new("http://127.0.0.1:5000/")
 
 
+def startup_timings():
+    return dict({"import": IMPORT_SECONDS}, **model.timings)
+
+
+# Everything above is cheap: TensorFlow / MediaPipe load in the LazyModel thread.
+# The debug reloader's parent process never serves requests, so it does not load the model.
+IMPORT_SECONDS = time.perf_counter() - _import_started
+print(f"🔹 Server ready for auth / static routes in {IMPORT_SECONDS:.2f}s")
+if MODEL_LOADING == "background" and not (__name__ == '__main__' and os.environ.get("WERKZEUG_RUN_MAIN") != "true"):
+    model.start()
+
+
 if __name__ == '__main__':
     # Only open the browser in the *main* process (not the reloader)
     if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
         threading.Timer(1.5, open_browser).start()
 
+    # Development server; use serve.py in production (no reloader, multi-worker)
     app.run(port=5000, debug=True)
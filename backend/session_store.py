@@ -0,0 +1,369 @@
+# session_store.py
+# Per-session state for the predict path in one slotted object per session.
+# The keypoint window is a preallocated float32 ring buffer of twice the
+# window length: every vector is written twice (at i and i + capacity), so
+# the last n vectors are always one contiguous slice and inference gets a
+# view instead of a fresh array per frame. Recent top-class votes are a
+# VoteCounts: the vote history plus per-class counts updated on every push,
+# so the stability check never recounts the window.
+#
+# Sessions are kept in an OrderedDict in access order, so eviction (idle
+# timeout, session cap, memory cap) only ever looks at the oldest entries.
+#
+# The part of a session that decides its predictions (keypoint window, recent
+# votes, last sign) goes through a session backend: MemorySessionBackend keeps
+# it in the SessionState, RedisSessionBackend keeps it in Redis so several
+# server instances can continue the same session without sticky routing.
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+
+class KeypointRing:
+    """Fixed-capacity window of keypoint vectors with a contiguous view of the newest ones."""
+    __slots__ = ("capacity", "data", "head", "size")
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.data = np.zeros((2 * capacity, width), dtype=np.float32)
+        self.head = 0    # next write position in [0, capacity)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, vector):
+        self.data[self.head] = vector
+        self.data[self.head + self.capacity] = vector
+        self.head = (self.head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def window(self):
+        """The buffered vectors, oldest first, as a (size, width) view (valid until the next append)."""
+        end = self.head + self.capacity
+        return self.data[end - self.size:end]
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+
+class VoteCounts:
+    """The last ``size`` top-class votes with per-class counts kept in step."""
+    __slots__ = ("history", "counts")
+
+    def __init__(self, size, num_classes):
+        self.history = deque(maxlen=size)
+        self.counts = np.zeros(num_classes, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.history)
+
+    def push(self, index):
+        if len(self.history) == self.history.maxlen:
+            self.counts[self.history[0]] -= 1   # the oldest vote drops out
+        self.history.append(index)
+        self.counts[index] += 1
+
+    def clear(self):
+        self.history.clear()
+        self.counts[:] = 0
+
+    @classmethod
+    def from_indices(cls, indices, size, num_classes):
+        votes = cls(size, num_classes)
+        for index in indices[-size:]:
+            votes.push(index)
+        return votes
+
+
+class SessionState:
+    """Everything the server remembers about one client session."""
+    __slots__ = ("session_id", "sequence", "votes", "last_sign", "last_access", "window_size",
+                 "stream_state", "gate_state", "roi_state", "lock")
+
+    def __init__(self, session_id, window_length, width, smoothing_window, num_classes):
+        self.session_id = session_id
+        # No local window when a shared backend holds it (window_length=0)
+        self.sequence = KeypointRing(window_length, width) if window_length else None
+        self.votes = VoteCounts(smoothing_window, num_classes)  # recent top-class votes
+        self.last_sign = None                               # last finalized sign
+        self.last_access = time.monotonic()
+        self.window_size = 0                                # frames in the window after the last update
+        self.stream_state = None
+        self.gate_state = None
+        self.roi_state = None
+        # Serializes requests of one session (tabs, WebSocket and HTTP can share an ID):
+        # the window handed to the model is a view of ``sequence``, and the gate,
+        # ROI and detector tracking state are updated frame by frame
+        self.lock = threading.Lock()
+
+
+class SessionStore:
+    """LRU map of session ID -> SessionState with idle, count and memory caps.
+
+    - ``max_age_seconds``: sessions idle for longer are dropped
+    - ``max_sessions``: the least recently used session is dropped beyond this
+    - ``max_bytes``: cap on keypoint buffer memory, converted to a session cap
+    - ``on_evict(session_id)``: called for every dropped session (e.g. to
+      release its detector)
+
+    ``get`` is O(1); eviction pops from the old end of the OrderedDict, so it
+    costs O(1) per evicted session and never scans live ones.
+    """
+
+    def __init__(self, factory, max_age_seconds=1800, max_sessions=10000, max_bytes=None, on_evict=None):
+        self.factory = factory
+        self.max_age_seconds = max_age_seconds
+        self.max_sessions = max_sessions
+        probe = factory("__probe__").sequence
+        if max_bytes and probe is not None:
+            per_session = probe.nbytes
+            self.max_sessions = max(1, min(max_sessions, int(max_bytes // per_session)))
+        self.on_evict = on_evict
+        self.evicted = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def peek(self, session_id):
+        """The session's state without touching its LRU position, or None."""
+        return self._sessions.get(session_id)
+
+    def get(self, session_id):
+        """The session's state (created on first use), marked as most recently used."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._sessions[session_id] = self.factory(session_id)
+            else:
+                self._sessions.move_to_end(session_id)
+            state.last_access = now
+            evicted = self._evict(now)
+        for sid in evicted:
+            self._notify(sid)
+        return state
+
+    def touch(self, session_id):
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None:
+                self._sessions.move_to_end(session_id)
+                state.last_access = time.monotonic()
+
+    def drop(self, session_id):
+        with self._lock:
+            state = self._sessions.pop(session_id, None)
+        if state is not None:
+            self._notify(session_id)
+        return state is not None
+
+    def memory_bytes(self):
+        with self._lock:
+            return sum(state.sequence.nbytes for state in self._sessions.values() if state.sequence is not None)
+
+    def _evict(self, now):
+        # Oldest first; stops at the first session that is neither expired nor over the cap
+        evicted = []
+        while self._sessions:
+            sid, state = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - state.last_access <= self.max_age_seconds:
+                break
+            del self._sessions[sid]
+            evicted.append(sid)
+        self.evicted += len(evicted)
+        return evicted
+
+    def _notify(self, session_id):
+        if self.on_evict is not None:
+            try:
+                self.on_evict(session_id)
+            except Exception as e:
+                print(f"⚠️ Session eviction hook failed: {e}")
+
+
+# ==============================
+# Session backends
+# ==============================
+class MemorySessionBackend:
+    """Window, votes and last sign live in this process's SessionState."""
+    name = "memory"
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def get(self, session_id):
+        return self.store.get(session_id)
+
+    def update(self, session, vectors):
+        """Append ``vectors`` (none: no hand, which clears the votes); returns the current window."""
+        if len(vectors):
+            for vector in vectors:
+                session.sequence.append(vector)
+        else:
+            session.votes.clear()
+        session.window_size = len(session.sequence)
+        return session.sequence.window()
+
+    def add_vote(self, session, index):
+        """Record the newest top-class index; returns the session's VoteCounts."""
+        session.votes.push(index)
+        return session.votes
+
+    def set_last_sign(self, session, sign):
+        session.last_sign = sign
+
+
+class RedisSessionBackend:
+    """Window, votes and last sign in Redis, shared by every server instance.
+
+    Each keypoint vector is one list element of packed float32 bytes (252
+    bytes); a MULTI/EXEC pipeline appends, trims to the window length,
+    refreshes the TTL and reads the window back in one round trip, so two
+    instances appending to the same session cannot interleave.
+
+    Detector tracking, ROI, motion-gate and streaming LSTM state stay in the
+    local ``store``: they are caches that rebuild themselves when a session
+    moves to another instance. Streaming mode rebuilds the new instance's
+    LSTM state from the shared window on its first frame there (a state that
+    has taken fewer steps than the window holds frames is always re-synced).
+    """
+    name = "redis"
+
+    def __init__(self, store, url="redis://localhost:6379/0", client=None, window_length=50, width=63,
+                 smoothing_window=10, num_classes=26, ttl_seconds=1800, prefix="handsign:session:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("The redis session backend needs the redis package (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self.store = store
+        self.client = client
+        self.window_length = window_length
+        self.width = width
+        self.smoothing_window = smoothing_window
+        self.num_classes = num_classes
+        self.ttl = max(1, int(ttl_seconds))
+        self.prefix = prefix
+
+    def __len__(self):
+        return len(self.store)
+
+    def _key(self, session_id, part):
+        return f"{self.prefix}{session_id}:{part}"
+
+    def get(self, session_id):
+        return self.store.get(session_id)
+
+    def update(self, session, vectors):
+        window_key = self._key(session.session_id, "window")
+        votes_key = self._key(session.session_id, "votes")
+        pipe = self.client.pipeline(transaction=True)
+        if len(vectors):
+            packed = np.asarray(vectors, dtype=np.float32).reshape(-1, self.width)
+            pipe.rpush(window_key, *[row.tobytes() for row in packed])
+            pipe.ltrim(window_key, -self.window_length, -1)
+        else:
+            pipe.delete(votes_key)
+        pipe.expire(window_key, self.ttl)
+        pipe.lrange(window_key, 0, -1)
+        rows = pipe.execute()[-1]
+        window = np.frombuffer(b"".join(rows), dtype=np.float32).reshape(len(rows), self.width)
+        session.window_size = len(rows)
+        return window
+
+    def add_vote(self, session, index):
+        votes_key = self._key(session.session_id, "votes")
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(votes_key, int(index))
+        pipe.ltrim(votes_key, -self.smoothing_window, -1)
+        pipe.expire(votes_key, self.ttl)
+        pipe.lrange(votes_key, 0, -1)
+        indices = [int(v) for v in pipe.execute()[-1]]
+        return VoteCounts.from_indices(indices, self.smoothing_window, self.num_classes)
+
+    def set_last_sign(self, session, sign):
+        session.last_sign = sign
+        self.client.set(self._key(session.session_id, "sign"), sign, ex=self.ttl)
+
+    def last_sign(self, session_id):
+        value = self.client.get(self._key(session_id, "sign"))
+        return value.decode() if value is not None else None
+
+
+def create_session_backend(name, store, url=None, **redis_options):
+    """Session backend selected in config (HANDSIGN_SESSION_BACKEND).
+
+    ``redis_options`` (window_length, width, smoothing_window, num_classes, ttl_seconds)
+    only apply to the redis backend; the memory one takes them from ``store``.
+    """
+    if name == MemorySessionBackend.name:
+        return MemorySessionBackend(store)
+    if name == RedisSessionBackend.name:
+        return RedisSessionBackend(store, url=url or "redis://localhost:6379/0", **redis_options)
+    raise ValueError(f"Unknown session backend '{name}'. Choose one of: memory, redis")
+
+
+if __name__ == "__main__":
+    # Backend check without a Redis server: two instances sharing one fakeredis
+    # server serve alternate frames of one session; windows, votes and last
+    # sign must match a single in-memory session fed the same frames.
+    try:
+        import fakeredis
+    except ImportError:
+        raise SystemExit("The check needs fakeredis (pip install fakeredis)")
+
+    window_length, width, smoothing_window, num_classes = 50, 63, 10, 26
+    server = fakeredis.FakeServer()
+
+    def redis_instance():
+        store = SessionStore(lambda sid: SessionState(sid, 0, width, smoothing_window, num_classes))
+        return RedisSessionBackend(store, client=fakeredis.FakeRedis(server=server), window_length=window_length,
+                                   width=width, smoothing_window=smoothing_window, num_classes=num_classes)
+
+    memory = MemorySessionBackend(
+        SessionStore(lambda sid: SessionState(sid, window_length, width, smoothing_window, num_classes)))
+    instances = [redis_instance(), redis_instance()]
+
+    rng = np.random.default_rng(0)
+    checked = 0
+    for frame in range(200):
+        # Mostly one vector per request, sometimes a batch or no hand
+        n = int(rng.choice([0, 1, 1, 1, 3]))
+        vectors = rng.random((n, width), dtype=np.float32)
+        index = int(rng.integers(num_classes))
+        backend = instances[frame % 2]
+
+        expected = memory.update(memory.get("s"), vectors).copy()
+        window = backend.update(backend.get("s"), vectors)
+        assert np.array_equal(window, expected), f"frame {frame}: window differs"
+        assert backend.get("s").window_size == memory.get("s").window_size
+
+        expected_votes = memory.add_vote(memory.get("s"), index)
+        votes = backend.add_vote(backend.get("s"), index)
+        assert list(votes.history) == list(expected_votes.history), f"frame {frame}: votes differ"
+        assert np.array_equal(votes.counts, expected_votes.counts)
+
+        memory.set_last_sign(memory.get("s"), f"sign{index}")
+        backend.set_last_sign(backend.get("s"), f"sign{index}")
+        assert instances[(frame + 1) % 2].last_sign("s") == memory.get("s").last_sign
+        checked += 1
+
+    print(f"✅ redis backend matches the memory backend over {checked} requests on two instances")
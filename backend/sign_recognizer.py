@@ -0,0 +1,147 @@
+# sign_recognizer.py
+# Turns per-window class probabilities into emitted signs: a sign is emitted
+# when the model is confident (top-1 probability and top-1/top-2 margin) and
+# the recent top-1 votes agree. One SignRecognizer serves the desktop loop
+# (app.py), the live server (model_handler) and offline transcription
+# (transcribe.py), each with its own constants, so they decide the same way.
+#
+# Votes are VoteCounts (per-class counts updated on every push), and the
+# top-1 / confidence step runs over a whole batch of probability rows at
+# once: one argmax and at most one partition per batch instead of per frame.
+import numpy as np
+
+from session_store import KeypointRing, VoteCounts
+
+# Server defaults (model_handler, transcribe.py); app.py uses its own, stricter ones
+THRESHOLD = 0.8               # slightly lower to avoid missing good preds
+MARGIN_THRESHOLD = 0.10       # relax margin for sensitivity
+SMOOTHING_WINDOW = 10         # larger window for stability
+STABILITY_RATIO = 0.7         # fraction of window that must agree
+MIN_SEQUENCE_FOR_INFERENCE = 24  # modest temporal context
+
+
+class RecognizerState:
+    """Keypoint window, recent votes and last emitted sign of one stream."""
+    __slots__ = ("window", "votes", "last_sign")
+
+    def __init__(self, window_length, width, smoothing_window, num_classes):
+        self.window = KeypointRing(window_length, width)
+        self.votes = VoteCounts(smoothing_window, num_classes)
+        self.last_sign = None
+
+
+class SignRecognizer:
+    """Buffers, smoothing and emit decisions for any number of streams.
+
+    Results are ``(top index, top probability, sign)`` tuples; ``sign`` is
+    the label when it is emitted and None otherwise.
+    """
+
+    def __init__(self, labels, threshold=THRESHOLD, margin_threshold=MARGIN_THRESHOLD,
+                 smoothing_window=SMOOTHING_WINDOW, stability_ratio=STABILITY_RATIO,
+                 min_sequence=MIN_SEQUENCE_FOR_INFERENCE, window_length=50, width=63):
+        self.labels = labels
+        self.threshold = threshold
+        self.margin_threshold = margin_threshold
+        self.smoothing_window = smoothing_window
+        self.stability_ratio = stability_ratio
+        self.min_sequence = min_sequence
+        self.window_length = window_length
+        self.width = width
+        # Votes needed out of n, for every n the vote window can hold
+        self._required = [max(1, int(np.ceil(stability_ratio * max(1, n)))) for n in range(smoothing_window + 1)]
+        # Above half, enough votes already make the top class the unique most common one
+        self._majority = stability_ratio > 0.5
+
+    def new_state(self):
+        return RecognizerState(self.window_length, self.width, self.smoothing_window, len(self.labels))
+
+    # ==============================
+    # Decisions
+    # ==============================
+    def rank_batch(self, probs):
+        """(top indices, top probabilities, confident mask) for a (batch, classes) array."""
+        probs = np.asarray(probs, dtype=np.float64)
+        top = probs.argmax(axis=1)
+        top_prob = probs[np.arange(len(probs)), top]
+        confident = top_prob >= self.threshold
+        # The top-2 margin only matters for rows that pass the threshold
+        if confident.any() and probs.shape[1] > 1:
+            second = np.partition(probs[confident], -2, axis=1)[:, -2]
+            confident[confident] = (top_prob[confident] - second) >= self.margin_threshold
+        return top, top_prob, confident
+
+    def rank(self, probs):
+        """(top index, top probability, confident) for one probability vector."""
+        top, top_prob, confident = self.rank_batch(np.asarray(probs)[np.newaxis])
+        return int(top[0]), float(top_prob[0]), bool(confident[0])
+
+    def is_stable(self, index, votes):
+        """True when ``index`` is the most common of ``votes`` (a VoteCounts that
+        already includes it) with at least ``stability_ratio`` of them."""
+        count = votes.counts[index]
+        if count < self._required[len(votes)]:
+            return False
+        if self._majority:
+            return True
+        if count < votes.counts.max():
+            return False
+        # On a tie the class voted for first wins, as with Counter.most_common
+        return next(v for v in votes.history if votes.counts[v] == count) == index
+
+    def _decide(self, state, index, prob, confident):
+        state.votes.push(index)
+        sign = self.labels[index] if confident and self.is_stable(index, state.votes) else None
+        if sign is not None:
+            state.last_sign = sign
+        return index, prob, sign
+
+    def decide_batch(self, states, probs):
+        """Records one vote per state from the matching row of ``probs``; returns their results."""
+        top, top_prob, confident = self.rank_batch(probs)
+        return [self._decide(state, int(i), float(p), bool(c))
+                for state, i, p, c in zip(states, top, top_prob, confident)]
+
+    # ==============================
+    # Keypoints in, results out
+    # ==============================
+    def process_batch(self, states, keypoints_list, predict_fn):
+        """One frame for each entry of ``states`` (the same state may repeat, in
+        frame order); ``keypoints_list`` holds a keypoint vector or None (no
+        hand) per frame. Ready windows go through ``predict_fn`` (a (batch,
+        frames, width) array -> (batch, classes) probabilities) in one call per
+        window length. Returns a result per frame, None while a window is too short.
+        """
+        # Snapshot every ready window: a later frame of the same state overwrites the ring
+        windows = []
+        for state, keypoints in zip(states, keypoints_list):
+            if keypoints is not None:
+                state.window.append(keypoints)
+            # Frames without a hand still classify the unchanged window
+            ready = len(state.window) >= self.min_sequence
+            windows.append(state.window.window().copy() if ready else None)
+
+        ready = [i for i, window in enumerate(windows) if window is not None]
+        by_length = {}
+        for i in ready:
+            by_length.setdefault(len(windows[i]), []).append(i)
+        probs = [None] * len(windows)
+        for group in by_length.values():
+            for i, output in zip(group, predict_fn(np.stack([windows[i] for i in group]))):
+                probs[i] = output
+
+        if ready:
+            top, top_prob, confident = self.rank_batch(np.stack([probs[i] for i in ready]))
+        results = [None] * len(windows)
+        row = 0
+        for i, (state, keypoints) in enumerate(zip(states, keypoints_list)):
+            if keypoints is None:
+                state.votes.clear()   # no hand: clear short-term vote history
+            if probs[i] is not None:
+                results[i] = self._decide(state, int(top[row]), float(top_prob[row]), bool(confident[row]))
+                row += 1
+        return results
+
+    def process(self, state, keypoints, predict_fn):
+        """``process_batch`` for a single frame."""
+        return self.process_batch([state], [keypoints], predict_fn)[0]
@@ -0,0 +1,114 @@
+# train_pipeline.py
+# Streaming training input: windows are read row by row from the (memory-mapped)
+# dataset, shuffled in a bounded buffer, batched, augmented in keypoint space
+# and prefetched, so the dataset never has to be materialized in RAM.
+import numpy as np
+
+from function import KEYPOINT_SIZE, actions
+
+
+class KeypointAugmenter:
+    """Vectorized keypoint-space augmentation for a (batch, timesteps, 63) array.
+
+    - jitter: Gaussian noise on every coordinate
+    - scale: per-sample, per-axis (x, y) scale around the normalized centre (0.5)
+    - rotation: per-sample in-plane rotation of x/y around the centre
+    - temporal crop: one random length per batch in [min_length, timesteps],
+      with a random start per sample (matches the 24–50 frame windows the
+      server actually feeds the model). With ``length_buckets`` every batch
+      is cropped to one of those lengths instead, so the variable-length
+      LSTM only ever sees a few distinct shapes.
+
+    Transforms are applied once per window (the same for all its frames), so a
+    window still looks like one consistent hand pose. Every frame is then
+    min-max normalized per axis again (``normalize_keypoints``), so augmented
+    windows stay in the exact [0, 1] range inference produces; scale changes
+    the normalized pose only in combination with rotation. All-zero frames
+    (no hand) stay zero.
+    """
+
+    def __init__(self, jitter=0.01, scale=(0.9, 1.1), rotation_degrees=10.0,
+                 min_length=24, crop_probability=0.5, length_buckets=None, seed=None):
+        self.jitter = jitter
+        self.scale = scale
+        self.rotation = np.deg2rad(rotation_degrees)
+        self.min_length = min_length
+        self.crop_probability = crop_probability
+        self.length_buckets = sorted(length_buckets) if length_buckets else None
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, batch):
+        batch = np.array(batch, dtype=np.float32)  # own copy; augmented in place
+        n, timesteps = batch.shape[:2]
+        points = batch.reshape(n, timesteps, 21, 3)
+        xy = points[..., :2]
+        empty = ~points.any(axis=(2, 3))
+
+        if self.rotation or self.scale:
+            theta = self.rng.uniform(-self.rotation, self.rotation, size=n) if self.rotation else np.zeros(n)
+            cos, sin = np.cos(theta), np.sin(theta)
+            # (n, 2, 2) rotation matrices, columns scaled per axis
+            transform = np.stack([np.stack([cos, -sin], -1), np.stack([sin, cos], -1)], -2)
+            if self.scale:
+                transform = transform * self.rng.uniform(*self.scale, size=(n, 1, 2))
+            xy -= 0.5
+            xy[...] = np.einsum("ntkj,nij->ntki", xy, transform.astype(np.float32))
+            xy += 0.5
+
+        if self.jitter:
+            points += self.rng.normal(0.0, self.jitter, size=points.shape).astype(np.float32)
+
+        # Back to per-frame, per-axis [0, 1] like function.normalize_keypoints
+        points -= points.min(axis=2, keepdims=True)
+        points /= np.maximum(points.max(axis=2, keepdims=True), 1e-6)
+        points[empty] = 0.0
+
+        length = timesteps
+        if self.length_buckets:
+            length = int(self.rng.choice([b for b in self.length_buckets if b <= timesteps] or [timesteps]))
+        elif self.min_length < timesteps and self.rng.random() < self.crop_probability:
+            length = int(self.rng.integers(self.min_length, timesteps + 1))
+        if length < timesteps:
+            starts = self.rng.integers(0, timesteps - length + 1, size=n)
+            batch = batch[np.arange(n)[:, None], starts[:, None] + np.arange(length)]
+
+        return batch
+
+
+def make_dataset(X, y, indices=None, batch_size=32, shuffle_buffer=512, augment=None,
+                 seed=None, num_classes=None):
+    """tf.data pipeline over rows of ``X`` (any array-like, e.g. an np.load mmap).
+
+    Yields (float32 windows, one-hot labels). Only ``shuffle_buffer`` windows
+    plus the prefetched batches are held in memory at a time.
+    """
+    import tensorflow as tf
+
+    num_classes = num_classes or int(actions.shape[0])
+    indices = np.arange(len(y)) if indices is None else np.asarray(indices)
+    timesteps = X.shape[1]
+
+    def rows():
+        for i in indices:
+            yield np.asarray(X[i], dtype=np.float32), np.int64(y[i])
+
+    ds = tf.data.Dataset.from_generator(
+        rows,
+        output_signature=(
+            tf.TensorSpec(shape=(timesteps, KEYPOINT_SIZE), dtype=tf.float32),
+            tf.TensorSpec(shape=(), dtype=tf.int64),
+        ),
+    ).apply(tf.data.experimental.assert_cardinality(len(indices)))
+    if shuffle_buffer:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+
+    if augment is not None:
+        def _augment(xb, yb):
+            xb = tf.numpy_function(augment, [xb], tf.float32)
+            xb.set_shape((None, None, KEYPOINT_SIZE))
+            return xb, yb
+        ds = ds.map(_augment, num_parallel_calls=1)
+
+    ds = ds.map(lambda xb, yb: (xb, tf.one_hot(yb, num_classes)))
+    return ds.prefetch(tf.data.AUTOTUNE)
@@ -1,56 +1,164 @@
 # trainmodel.py
+#   python trainmodel.py [--epochs 200] [--patience 20] [--threads N] [--fresh]
+# Re-running after a crash resumes from the last epoch backup in checkpoints/backup.
 from function import *
 from sklearn.model_selection import train_test_split
-from keras.utils import to_categorical
 from keras.models import Sequential
 from keras.layers import LSTM, Dense, Dropout
-from keras.callbacks import TensorBoard
+from keras.callbacks import TensorBoard, EarlyStopping, ModelCheckpoint, BackupAndRestore
+from dataset import PACKED_DATA_PATH, packed_exists, load_packed
+from train_pipeline import make_dataset, KeypointAugmenter
+import argparse
+import json
+import shutil
 import numpy as np
 import os
 
-label_map = {label:num for num, label in enumerate(actions)}
-# print(label_map)
-sequences, labels = [], []
-for action in actions:
-    for sequence in range(no_sequences):
-        window = []
-        for frame_num in range(sequence_length):
-            path = os.path.join(DATA_PATH, action, str(sequence), f"{frame_num}.npy")
-            if not os.path.exists(path):
-                print(f"⚠️ Missing file: {path}")
-                continue
-            res = np.load(path)
-            window.append(res)
-
-        if len(window) == sequence_length:
-            sequences.append(window)
-            labels.append(label_map[action])
-        else:
-            print(f"⚠️ Skipped {action}-{sequence}, incomplete data ({len(window)}/{sequence_length})")
-
-X = np.array(sequences)
-y = to_categorical(labels).astype(int)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.05)
-
-log_dir = os.path.join('Logs')
-tb_callback = TensorBoard(log_dir=log_dir)
-
-#version 1
-model = Sequential()
-model.add(LSTM(128, return_sequences=True, activation='relu', input_shape=(None, 63)))
-model.add(LSTM(256, return_sequences=True, activation='relu'))
-model.add(LSTM(128, return_sequences=False, activation='relu'))
-model.add(Dense(128, activation='relu'))
-model.add(Dropout(0.3))
-model.add(Dense(64, activation='relu'))
-model.add(Dense(actions.shape[0], activation='softmax'))
-
-res = [.7, 0.2, 0.1]
-model.compile(optimizer='Adam', loss='categorical_crossentropy', metrics=['categorical_accuracy'])
-model.fit(X_train, y_train, epochs=200, callbacks=[tb_callback])
-model.summary()
-
-model_json = model.to_json()
-with open("model.json", "w") as json_file:
-    json_file.write(model_json)
-model.save('model.h5')
\ No newline at end of file
+CHECKPOINT_DIR = os.path.join('checkpoints')
+SPLIT_PATH = os.path.join(CHECKPOINT_DIR, 'split.json')
+
+# Window lengths the server actually feeds the model (min_sequence_for_inference .. 50)
+LENGTH_BUCKETS = (24, 32, 40, 50)
+
+
+def load_training_data():
+    label_map = {label:num for num, label in enumerate(actions)}
+    # print(label_map)
+    if packed_exists(PACKED_DATA_PATH):
+        # Packed dataset (python dataset.py pack): zero-copy memory map, no per-frame file opens
+        X_all, labels, _ = load_packed(PACKED_DATA_PATH, mmap=True)
+        print(f"🔹 Using packed dataset {PACKED_DATA_PATH} {X_all.shape}")
+        return X_all, np.asarray(labels)
+
+    sequences, labels = [], []
+    for action in actions:
+        for sequence in range(no_sequences):
+            window = []
+            for frame_num in range(sequence_length):
+                path = os.path.join(DATA_PATH, action, str(sequence), f"{frame_num}.npy")
+                if not os.path.exists(path):
+                    print(f"⚠️ Missing file: {path}")
+                    continue
+                res = np.load(path)
+                window.append(res)
+
+            if len(window) == sequence_length:
+                sequences.append(window)
+                labels.append(label_map[action])
+            else:
+                print(f"⚠️ Skipped {action}-{sequence}, incomplete data ({len(window)}/{sequence_length})")
+    return np.array(sequences), np.asarray(labels)
+
+
+def split_indices(labels, test_size=0.05, val_size=0.1, seed=42):
+    """Held-out test split (kept for evaluation/export reports) + validation split for early stopping.
+
+    The split is saved to checkpoints/split.json so a resumed run trains on
+    exactly the same rows.
+    """
+    if os.path.exists(SPLIT_PATH):
+        with open(SPLIT_PATH) as f:
+            saved = json.load(f)
+        if saved.get("n") == len(labels):
+            return tuple(np.asarray(saved[k], dtype=np.int64) for k in ("train", "val", "test"))
+
+    idx = np.arange(len(labels))
+    stratify = labels if np.min(np.bincount(labels)) >= 3 else None
+    rest_idx, test_idx = train_test_split(idx, test_size=test_size, random_state=seed, stratify=stratify)
+    rest_stratify = labels[rest_idx] if stratify is not None else None
+    train_idx, val_idx = train_test_split(rest_idx, test_size=val_size / (1.0 - test_size),
+                                          random_state=seed, stratify=rest_stratify)
+    train_idx, val_idx, test_idx = (np.sort(i) for i in (train_idx, val_idx, test_idx))
+
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    with open(SPLIT_PATH, "w") as f:
+        json.dump({"n": len(labels), "train": train_idx.tolist(), "val": val_idx.tolist(),
+                   "test": test_idx.tolist()}, f)
+    return train_idx, val_idx, test_idx
+
+
+def configure_threads(intra_op, inter_op):
+    """Pin TF thread pools (CPU boxes); 0 keeps TensorFlow's default."""
+    import tensorflow as tf
+    if intra_op:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    if inter_op:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+
+def build_model():
+    #version 1
+    model = Sequential()
+    model.add(LSTM(128, return_sequences=True, activation='relu', input_shape=(None, 63)))
+    model.add(LSTM(256, return_sequences=True, activation='relu'))
+    model.add(LSTM(128, return_sequences=False, activation='relu'))
+    model.add(Dense(128, activation='relu'))
+    model.add(Dropout(0.3))
+    model.add(Dense(64, activation='relu'))
+    model.add(Dense(actions.shape[0], activation='softmax'))
+    return model
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the sign language LSTM")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--patience", type=int, default=20, help="early-stopping patience on val_loss")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--shuffle-buffer", type=int, default=512)
+    parser.add_argument("--val-split", type=float, default=0.1)
+    parser.add_argument("--no-augment", action="store_true")
+    parser.add_argument("--length-buckets", type=int, nargs="+", default=list(LENGTH_BUCKETS),
+                        help="window lengths sampled per batch (variable-length training)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 0, help="TF intra-op threads")
+    parser.add_argument("--inter-op-threads", type=int, default=2)
+    parser.add_argument("--fresh", action="store_true", help="discard the resume backup and split")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    configure_threads(args.threads, args.inter_op_threads)
+
+    if args.fresh and os.path.exists(CHECKPOINT_DIR):
+        shutil.rmtree(CHECKPOINT_DIR)
+
+    X_all, labels = load_training_data()
+    train_idx, val_idx, test_idx = split_indices(labels, val_size=args.val_split)
+    print(f"🔹 Split: {len(train_idx)} train / {len(val_idx)} val / {len(test_idx)} held-out test")
+
+    # Streaming input pipeline: bounded shuffle buffer, on-the-fly augmentation, prefetch.
+    # Each training batch is cropped to one of the length buckets.
+    augment_kwargs = dict(jitter=0, scale=None, rotation_degrees=0) if args.no_augment else {}
+    augmenter = KeypointAugmenter(length_buckets=args.length_buckets, **augment_kwargs)
+    train_ds = make_dataset(X_all, labels, train_idx, batch_size=args.batch_size,
+                            shuffle_buffer=args.shuffle_buffer, augment=augmenter)
+    val_ds = make_dataset(X_all, labels, val_idx, batch_size=args.batch_size, shuffle_buffer=0)
+
+    log_dir = os.path.join('Logs')
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    callbacks = [
+        TensorBoard(log_dir=log_dir),
+        EarlyStopping(monitor='val_loss', patience=args.patience, restore_best_weights=True, verbose=1),
+        ModelCheckpoint(os.path.join(CHECKPOINT_DIR, 'best.keras'), monitor='val_loss', save_best_only=True),
+        # Per-epoch backup; an interrupted run picks up from here on restart
+        BackupAndRestore(backup_dir=os.path.join(CHECKPOINT_DIR, 'backup')),
+    ]
+
+    model = build_model()
+    model.compile(optimizer='Adam', loss='categorical_crossentropy', metrics=['categorical_accuracy'])
+    model.fit(train_ds, validation_data=val_ds, epochs=args.epochs, callbacks=callbacks)
+    model.summary()
+
+    if len(test_idx):
+        test_ds = make_dataset(X_all, labels, test_idx, batch_size=args.batch_size, shuffle_buffer=0)
+        loss, accuracy = model.evaluate(test_ds, verbose=0)
+        print(f"✅ Held-out test: loss {loss:.4f}, accuracy {accuracy:.2%}")
+
+    model_json = model.to_json()
+    with open("model.json", "w") as json_file:
+        json_file.write(model_json)
+    model.save('model.h5')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# transcribe.py
+# Offline transcription of recorded sessions (QA, dataset building): video
+# files and image folders go through decode -> MediaPipe -> LSTM as
+# overlapping pipeline stages, and every frame's letter and confidence is
+# written to CSV or JSONL.
+#
+#   python transcribe.py session1.mp4 Image/A [--out transcript.csv] [--batch-size 16]
+#
+# Stages run in their own threads connected by bounded queues, so decoding
+# the next frames overlaps detection and classification. Ready windows are
+# batched into one model call per window length. Decisions come from a
+# SignRecognizer with the live server's constants, so the emitted letters
+# match what a browser session would have shown for the same frames.
+import argparse
+import csv
+import glob
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+import cv2
+
+from function import KEYPOINT_SIZE, actions, extract_keypoints, mediapipe_detection, mp_hands
+from inference_backends import create_backend, load_keras_model
+from sign_recognizer import SignRecognizer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+WINDOW_LENGTH = 50
+DOWNSCALE_WIDTH = 320   # same as the server (model_handler.DOWNSCALE_WIDTH)
+_END = object()         # end of all sources
+
+
+# ==============================
+# Sources
+# ==============================
+def natural_key(path):
+    """Sort key that orders numbered files by value (2.png before 10.png)."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", os.path.basename(path))]
+
+
+def iter_frames(source, fps=30.0):
+    """(frame index, timestamp ms, file name, BGR frame) from a video file or an
+    image folder (in numeric-aware name order); the file name is empty for videos."""
+    if os.path.isdir(source):
+        paths = sorted((p for p in glob.glob(os.path.join(source, "*")) if p.lower().endswith(IMAGE_EXTENSIONS)),
+                       key=natural_key)
+        for index, path in enumerate(paths):
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield index, index * 1000.0 / fps, os.path.basename(path), frame
+        return
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise OSError(f"Cannot open {source}")
+    index = 0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield index, cap.get(cv2.CAP_PROP_POS_MSEC), "", frame
+            index += 1
+    finally:
+        cap.release()
+
+
+# ==============================
+# Pipeline stages
+# ==============================
+class Stage(threading.Thread):
+    """Worker thread: ``step(item)`` for every item of ``inbox`` until _END, which is passed on."""
+
+    def __init__(self, name, inbox, outbox):
+        super().__init__(name=name, daemon=True)
+        self.inbox = inbox
+        self.outbox = outbox
+        self.busy_seconds = 0.0
+        self.items = 0
+        self.error = None
+
+    def run(self):
+        try:
+            while True:
+                item = self.inbox.get()
+                if item is _END:
+                    break
+                started = time.perf_counter()
+                self.step(item)
+                self.busy_seconds += time.perf_counter() - started
+                self.items += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self.outbox.put(_END)
+
+
+class DetectStage(Stage):
+    """MediaPipe in tracking mode (like the server); reset between sources."""
+
+    def __init__(self, inbox, outbox, model_complexity=0):
+        super().__init__("detect", inbox, outbox)
+        self.hands = mp_hands.Hands(static_image_mode=False, max_num_hands=1, model_complexity=model_complexity,
+                                    min_detection_confidence=0.6, min_tracking_confidence=0.6)
+        self.source = None
+
+    def step(self, item):
+        source, index, time_ms, file, frame = item
+        if source != self.source:
+            self.hands.reset()
+            self.source = source
+        h, w = frame.shape[:2]
+        if w > DOWNSCALE_WIDTH:
+            scale = DOWNSCALE_WIDTH / float(w)
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        _, results = mediapipe_detection(frame, self.hands)
+        keypoints = extract_keypoints(results) if results.multi_hand_landmarks else None
+        self.outbox.put((source, index, time_ms, file, keypoints))
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            self.hands.close()
+
+
+class ClassifyStage(Stage):
+    """One recognizer state per source; drains whatever is queued (up to
+    ``batch_size`` frames) and hands it to SignRecognizer.process_batch."""
+
+    def __init__(self, inbox, outbox, backend, batch_size=16):
+        super().__init__("classify", inbox, outbox)
+        self.backend = backend
+        self.batch_size = batch_size
+        self.recognizer = SignRecognizer(actions, window_length=WINDOW_LENGTH, width=KEYPOINT_SIZE)
+        self.states = {}
+        self.model_calls = 0
+
+    def run(self):
+        try:
+            done = False
+            while not done:
+                batch = [self.inbox.get()]
+                while batch[-1] is not _END and len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.inbox.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is _END:
+                    batch.pop()
+                    done = True
+                started = time.perf_counter()
+                self.step_batch(batch)
+                self.busy_seconds += time.perf_counter() - started
+                self.items += len(batch)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.outbox.put(_END)
+
+    def predict(self, windows):
+        self.model_calls += 1
+        return self.backend.predict(windows)
+
+    def step_batch(self, batch):
+        for source, *_ in batch:
+            if source not in self.states:
+                self.states[source] = self.recognizer.new_state()
+        states = [self.states[source] for source, *_ in batch]
+        results = self.recognizer.process_batch(states, [item[-1] for item in batch], self.predict)
+        for (source, index, time_ms, file, keypoints), result in zip(batch, results):
+            row = {"source": source, "frame": index, "file": file, "time_ms": round(time_ms, 1),
+                   "hand": keypoints is not None, "top": "", "top_prob": 0.0, "sign": "", "confidence": 0.0}
+            if result is not None:
+                top_idx, top_prob, sign = result
+                row["top"], row["top_prob"] = actions[top_idx], round(top_prob, 4)
+                if sign is not None:
+                    row["sign"], row["confidence"] = sign, round(top_prob, 2)
+            self.outbox.put(row)
+
+
+# ==============================
+# Output
+# ==============================
+FIELDS = ("source", "frame", "file", "time_ms", "hand", "top", "top_prob", "sign", "confidence")
+
+
+def open_writer(path):
+    """Returns (write(row), close()) for a .csv / .jsonl path, or JSONL on stdout for '-'."""
+    if path == "-":
+        return lambda row: print(json.dumps(row)), lambda: None
+    f = open(path, "w", newline="")
+    if path.lower().endswith(".csv"):
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        return writer.writerow, f.close
+    return lambda row: f.write(json.dumps(row) + "\n"), f.close
+
+
+def transcribe(sources, out, backend, batch_size=16, queue_size=64, fps=30.0, model_complexity=0):
+    """Runs the pipeline; returns ({source: transcript}, stats)."""
+    frames_q = queue.Queue(maxsize=queue_size)
+    keypoints_q = queue.Queue(maxsize=queue_size)
+    rows_q = queue.Queue(maxsize=queue_size)
+    detect = DetectStage(frames_q, keypoints_q, model_complexity)
+    classify = ClassifyStage(keypoints_q, rows_q, backend, batch_size)
+
+    decode_errors = []
+
+    def decode():
+        try:
+            for source in sources:
+                for index, time_ms, file, frame in iter_frames(source, fps):
+                    frames_q.put((source, index, time_ms, file, frame))
+        except Exception as e:
+            decode_errors.append(e)   # re-raised below, like the stages' errors
+        finally:
+            frames_q.put(_END)
+
+    decode_started = time.perf_counter()
+    decoder = threading.Thread(target=decode, name="decode", daemon=True)
+    for thread in (decoder, detect, classify):
+        thread.start()
+
+    write, close = open_writer(out)
+    transcripts = {source: [] for source in sources}
+    frames = 0
+    try:
+        while True:
+            row = rows_q.get()
+            if row is _END:
+                break
+            write(row)
+            frames += 1
+            transcript = transcripts[row["source"]]
+            # Like the server's sentence buffer: a sign is added when it differs from the previous one
+            if row["sign"] and (not transcript or transcript[-1] != row["sign"]):
+                transcript.append(row["sign"])
+    finally:
+        close()
+    wall = time.perf_counter() - decode_started
+    if decode_errors:
+        raise decode_errors[0]
+    for stage in (detect, classify):
+        if stage.error is not None:
+            raise stage.error
+
+    stats = {"frames": frames, "seconds": round(wall, 2), "fps": round(frames / wall, 1) if wall else None,
+             "detect_busy_s": round(detect.busy_seconds, 2), "classify_busy_s": round(classify.busy_seconds, 2),
+             "model_calls": classify.model_calls}
+    return {source: "".join(signs) for source, signs in transcripts.items()}, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcribe recorded videos / image folders to per-frame letters")
+    parser.add_argument("inputs", nargs="+", help="video files or folders of images")
+    parser.add_argument("--out", default="transcript.csv", help=".csv, .jsonl, or - for JSONL on stdout")
+    parser.add_argument("--batch-size", type=int, default=16, help="max frames classified per model call")
+    parser.add_argument("--queue-size", type=int, default=64, help="bound of every inter-stage queue")
+    parser.add_argument("--fps", type=float, default=30.0, help="frame rate assumed for image folders")
+    parser.add_argument("--model-complexity", type=int, default=0, choices=(0, 1))
+    parser.add_argument("--backend", default=os.environ.get("HANDSIGN_INFERENCE_BACKEND", "compiled"))
+    parser.add_argument("--model-export", default=os.environ.get("HANDSIGN_MODEL_EXPORT") or None,
+                        help="exported numpy/tflite model (see export_model.py)")
+    args = parser.parse_args()
+    missing = [path for path in args.inputs if not os.path.exists(path)]
+    if missing:
+        parser.error(f"not found: {', '.join(missing)}")
+
+    model = None
+    if not (args.model_export and args.backend in ("numpy", "tflite")):
+        model = load_keras_model(os.path.join(BASE_DIR, "model.json"), os.path.join(BASE_DIR, "model.h5"))
+    backend = create_backend(args.backend, model, path=args.model_export)
+
+    transcripts, stats = transcribe(args.inputs, args.out, backend, args.batch_size, args.queue_size, args.fps,
+                                    args.model_complexity)
+    out = sys.stderr if args.out == "-" else sys.stdout
+    for source, text in transcripts.items():
+        print(f"🔹 {source}: {text or '(nothing recognized)'}", file=out)
+    print(f"✅ {stats['frames']} frames in {stats['seconds']}s ({stats['fps']} fps), "
+          f"{stats['model_calls']} model calls; busy: detect {stats['detect_busy_s']}s, "
+          f"classify {stats['classify_busy_s']}s" + ("" if args.out == "-" else f" -> {args.out}"), file=out)
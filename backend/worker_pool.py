@@ -0,0 +1,357 @@
+# worker_pool.py
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from image_decode import decode_base64_image, decode_image_bytes
+from lazy_model import ModelNotReady
+from metrics import MetricsRegistry
+
+# Largest frame a slot can hold (1080p BGR); bigger frames are downscaled first.
+MAX_FRAME_WIDTH = 1920
+MAX_FRAME_HEIGHT = 1080
+SLOT_BYTES = MAX_FRAME_WIDTH * MAX_FRAME_HEIGHT * 3
+
+# Seconds a request waits for its worker before answering 503 (warm-up has no limit)
+RESULT_TIMEOUT = float(os.environ.get("HANDSIGN_WORKER_TIMEOUT", "30"))
+_LIVENESS_INTERVAL = 1.0   # how often the collector checks that workers are alive
+_RESPAWN_DELAY_MAX = 60.0  # a worker that keeps crashing is restarted after 1, 2, 4 ... up to 60 s
+_STABLE_SECONDS = 60.0     # a worker that ran this long before exiting is restarted at once
+
+
+class WorkerError(RuntimeError):
+    """A prediction failed inside a worker process."""
+
+
+class WorkerUnavailable(ModelNotReady):
+    """The worker died or did not answer in time; the server answers 503."""
+
+    def __init__(self, message):
+        super().__init__("unavailable")
+        self.args = (message,)
+
+
+# ==============================
+# Worker process
+# ==============================
+def _worker_main(index, shm_name, slot_bytes, requests, results):
+    # One detector per process; parallelism comes from the processes.
+    os.environ.setdefault("HANDSIGN_HANDS_POOL_SIZE", "1")
+    import model_handler
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        while True:
+            message = requests.get()
+            if message is None:
+                break
+            request_id = message[1]
+            try:
+                result = _handle(model_handler, message, shm, slot_bytes)
+                results.put((index, request_id, True, result))
+            except Exception as e:
+                results.put((index, request_id, False, (type(e).__name__, str(e))))
+    finally:
+        shm.close()
+
+
+def _handle(model_handler, message, shm, slot_bytes):
+    kind = message[0]
+    if kind == "frame":
+        _, _, slot, shape, session_id = message
+        # Zero-copy view of the slot; it is released when this function returns
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+        return model_handler.predict_frame(frame, session_id=session_id)
+    if kind == "keypoints":
+        _, _, keypoints, session_id = message
+        return model_handler.predict_keypoints(keypoints, session_id=session_id)
+    if kind == "stats":
+        return model_handler.get_inference_stats()
+    if kind == "metrics":
+        return model_handler.get_metrics()
+    if kind == "warmup":
+        return model_handler.warmup()
+    raise ValueError(f"Unknown worker message '{kind}'")
+
+
+# ==============================
+# Server-side pool
+# ==============================
+class _Worker:
+    def __init__(self, ctx, index, slots, results, ready=True, crashes=0):
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * SLOT_BYTES)
+        self.requests = ctx.Queue()
+        self.slots = slots
+        self.free_slots = queue.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(index, self.shm.name, SLOT_BYTES, self.requests, results),
+            name=f"handsign-worker-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        self.started = time.monotonic()
+        self.dead = False
+        self.ready = ready        # False for a replacement until its warm-up finishes
+        self.crashes = crashes    # exits in a row shortly after starting (respawn backoff)
+        self.respawn_at = None
+
+    def release(self):
+        """Removes the shared memory of a worker whose process has exited. The
+        mapping itself goes with this object: a request thread may still be
+        writing a frame it took a slot for before the exit was noticed."""
+        self.shm.unlink()
+
+    def write_frame(self, frame):
+        """Copy a frame into a free ring-buffer slot; waits while all slots are in flight."""
+        try:
+            slot = self.free_slots.get(timeout=RESULT_TIMEOUT)
+        except queue.Empty:
+            raise WorkerUnavailable(f"{self.process.name} has no free frame slot")
+        if self.dead:
+            self.free_slots.put(slot)
+            raise WorkerUnavailable(f"{self.process.name} exited with code {self.process.exitcode}")
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * SLOT_BYTES)
+        view[...] = frame
+        return slot
+
+
+class ProcessWorkerPool:
+    """Runs MediaPipe + model in ``num_workers`` processes.
+
+    The server process only decodes requests. Frames are handed to workers
+    through per-worker ``multiprocessing.shared_memory`` ring buffers (only
+    the slot index and shape travel over the queue, no pickled arrays).
+    Each worker imports ``model_handler`` and so owns its own model, Hands
+    detector and session buffers; sessions are routed by a stable hash of
+    the session ID so a session's state always lives in the same worker.
+
+    A worker whose process exits is replaced by a new process with a fresh
+    shared-memory ring buffer. Its sessions get 503 until the replacement
+    is warmed up and then start over with empty windows.
+    """
+
+    def __init__(self, num_workers, slots_per_worker=4):
+        self._ctx = mp.get_context("spawn")  # never fork a process that has TensorFlow loaded
+        self._slots_per_worker = slots_per_worker
+        self._results = self._ctx.Queue()
+        self._workers = [_Worker(self._ctx, i, slots_per_worker, self._results) for i in range(max(1, num_workers))]
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._closed = False
+
+        # Decoding happens here, in the server process; everything else is measured in the workers
+        self.metrics_registry = MetricsRegistry()
+        self._decode_seconds = self.metrics_registry.histogram(
+            "stage_duration_seconds", "Time spent in each stage of the predict path", stage="decode")
+        self.metrics_registry.callback("worker_frames_in_flight", "Shared-memory slots currently in use",
+                                       lambda: [({"worker": str(i)}, w.slots - w.free_slots.qsize())
+                                                for i, w in enumerate(self._workers)])
+        self.restarts = 0
+        self.metrics_registry.callback("worker_restarts_total", "Worker processes replaced after exiting",
+                                       lambda: self.restarts, kind="counter")
+        self._collector = threading.Thread(target=self._collect, name="worker-results", daemon=True)
+        self._collector.start()
+
+    @property
+    def num_workers(self):
+        return len(self._workers)
+
+    def worker_for(self, session_id):
+        return zlib.crc32(str(session_id).encode("utf-8")) % len(self._workers)
+
+    # ------------------------------
+    # Prediction API (mirrors model_handler)
+    # ------------------------------
+    def predict_frame(self, frame, session_id="default"):
+        frame = _fit_frame(frame)
+        index = self.worker_for(session_id)
+        worker = self._workers[index]
+        slot = worker.write_frame(frame)
+        future = self._send(index, lambda request_id: ("frame", request_id, slot, frame.shape, session_id), slot,
+                            worker=worker)
+        return self._result(future)
+
+    def predict_sign(self, base64_image, session_id="default"):
+        with self._decode_seconds.time():
+            frame = decode_base64_image(base64_image)
+        return self.predict_frame(frame, session_id=session_id)
+
+    def predict_image_bytes(self, image_bytes, session_id="default"):
+        with self._decode_seconds.time():
+            frame = decode_image_bytes(image_bytes)
+        return self.predict_frame(frame, session_id=session_id)
+
+    def predict_keypoints(self, keypoints, session_id="default"):
+        index = self.worker_for(session_id)
+        future = self._send(index, lambda request_id: ("keypoints", request_id, keypoints, session_id))
+        return self._result(future)
+
+    def get_inference_stats(self):
+        """Per-worker stats; None for a worker that is down or restarting."""
+        return {"workers": self._ask_each("stats")}
+
+    def get_metrics(self):
+        """[(labels, snapshot), ...] for ``metrics.render``: this process plus one entry per live worker."""
+        snapshots = [({"worker": "server"}, self.metrics_registry.collect())]
+        snapshots += [({"worker": str(i)}, snapshot) for i, snapshot in enumerate(self._ask_each("metrics"))
+                      if snapshot is not None]
+        return snapshots
+
+    def warmup(self):
+        """Warm up every worker in parallel; returns the slowest worker's seconds."""
+        futures = [self._send(i, lambda request_id: ("warmup", request_id)) for i in range(len(self._workers))]
+        return max(self._result(f, timeout=None) for f in futures)
+
+    def close(self):
+        with self._pending_lock:   # no respawn after this
+            if self._closed:
+                return
+            self._closed = True
+        for worker in self._workers:
+            worker.requests.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            if not worker.dead:
+                worker.release()
+        self._results.put(None)
+        self._collector.join(timeout=1.0)
+
+    # ------------------------------
+    # Internals
+    # ------------------------------
+    def _send(self, index, build_message, slot=None, worker=None, warming=False):
+        """``worker``: the one whose slot was written (it may have been replaced since)."""
+        worker = worker or self._workers[index]
+        request_id = next(self._ids)
+        future = Future()
+        with self._pending_lock:
+            if worker.dead or not (worker.ready or warming):
+                if slot is not None:
+                    worker.free_slots.put(slot)
+                if worker.dead:
+                    raise WorkerUnavailable(f"{worker.process.name} exited with code {worker.process.exitcode}")
+                raise WorkerUnavailable(f"{worker.process.name} is restarting")
+            self._pending[request_id] = (future, worker, slot)
+        worker.requests.put(build_message(request_id))
+        return future
+
+    def _ask_each(self, kind):
+        """The answer of every worker to a ``kind`` message, None where it is unavailable."""
+        futures = []
+        for i in range(len(self._workers)):
+            try:
+                futures.append(self._send(i, lambda request_id: (kind, request_id)))
+            except WorkerUnavailable:
+                futures.append(None)
+        answers = []
+        for future in futures:
+            try:
+                answers.append(self._result(future) if future is not None else None)
+            except WorkerUnavailable:
+                answers.append(None)
+        return answers
+
+    @staticmethod
+    def _result(future, timeout=RESULT_TIMEOUT):
+        try:
+            ok, value = future.result(timeout=timeout)
+        except FutureTimeout:
+            raise WorkerUnavailable(f"No answer from the worker within {timeout:g}s")
+        if ok:
+            return value
+        error_type, message = value
+        if error_type == "ValueError":
+            raise ValueError(message)
+        raise WorkerError(f"{error_type}: {message}")
+
+    def _collect(self):
+        while True:
+            try:
+                item = self._results.get(timeout=_LIVENESS_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if item is None:
+                return
+            _, request_id, ok, value = item
+            with self._pending_lock:
+                entry = self._pending.pop(request_id, None)
+            if entry is None:
+                continue   # its worker was declared dead in the meantime
+            future, worker, slot = entry
+            if slot is not None:
+                worker.free_slots.put(slot)
+            future.set_result((ok, value))
+
+    def _check_workers(self):
+        """Fails the pending requests of workers that exited and replaces them."""
+        if self._closed:
+            return
+        now = time.monotonic()
+        for index, worker in enumerate(self._workers):
+            if not worker.dead:
+                if worker.process.is_alive():
+                    continue
+                self._fail_worker(worker, now)
+            if now >= worker.respawn_at:
+                self._respawn(index, worker)
+
+    def _fail_worker(self, worker, now):
+        print(f"❌ {worker.process.name} exited with code {worker.process.exitcode}")
+        with self._pending_lock:
+            worker.dead = True
+            lost = [(request_id, entry) for request_id, entry in self._pending.items() if entry[1] is worker]
+            for request_id, _ in lost:
+                del self._pending[request_id]
+        error = WorkerUnavailable(f"{worker.process.name} exited with code {worker.process.exitcode}")
+        for _, (future, _, slot) in lost:
+            if slot is not None:
+                worker.free_slots.put(slot)
+            future.set_exception(error)
+        # Back off when the worker keeps exiting right after it starts
+        if now - worker.started >= _STABLE_SECONDS:
+            worker.crashes = 0
+        worker.respawn_at = now + (min(_RESPAWN_DELAY_MAX, 2.0 ** (worker.crashes - 1)) if worker.crashes else 0.0)
+        worker.crashes += 1
+        worker.release()
+
+    def _respawn(self, index, worker):
+        with self._pending_lock:
+            if self._closed:
+                return
+            replacement = _Worker(self._ctx, index, self._slots_per_worker, self._results, ready=False,
+                                  crashes=worker.crashes)
+            self._workers[index] = replacement
+            self.restarts += 1
+        print(f"🔁 Restarted {replacement.process.name} (pid {replacement.process.pid}); warming up")
+        future = self._send(index, lambda request_id: ("warmup", request_id), worker=replacement, warming=True)
+
+        def warmed_up(done):
+            if not done.exception() and done.result()[0]:
+                replacement.ready = True
+                print(f"✅ {replacement.process.name} ready")
+        future.add_done_callback(warmed_up)
+
+
+def _fit_frame(frame):
+    """Ensure the frame is uint8 BGR, contiguous and small enough for a slot."""
+    h, w = frame.shape[:2]
+    if w > MAX_FRAME_WIDTH or h > MAX_FRAME_HEIGHT:
+        scale = min(MAX_FRAME_WIDTH / float(w), MAX_FRAME_HEIGHT / float(h))
+        frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    return np.ascontiguousarray(frame, dtype=np.uint8)
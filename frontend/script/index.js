@@ -12,7 +12,7 @@ const detectedSign = document.getElementById('detectedSign');
 
 let stream = null;
 let cameraOn = false; 
-let intervalId = null; 
+let frameTimer = null; 
 
 // =========================
 // TEXT TO SPEECH (Web Speech API)
@@ -65,8 +65,53 @@ function speakText(text) {
 
 // Predict request throttle + downscale/compress for speed
 let inflight = false;
+// Send interval; the server raises it (result.nextFrameMs) while no hand is visible or nothing moves
+const DEFAULT_FRAME_MS = 250;
+let nextFrameMs = DEFAULT_FRAME_MS;
 const SESSION_ID = (() => Math.random().toString(36).slice(2))();
 
+// Binary upload avoids base64/JSON overhead; the JSON route stays as a fallback
+let useBinaryUpload = typeof HTMLCanvasElement !== 'undefined' && !!HTMLCanvasElement.prototype.toBlob;
+
+function canvasToBlob(canvas) {
+    return new Promise(resolve => {
+        canvas.toBlob(blob => {
+            if (blob && blob.type === 'image/webp') return resolve(blob);
+            // WebP not supported; fallback to JPEG
+            canvas.toBlob(resolve, 'image/jpeg', 0.7);
+        }, 'image/webp', 0.7);
+    });
+}
+
+async function postFrame(canvas) {
+    if (useBinaryUpload) {
+        const blob = await canvasToBlob(canvas);
+        if (blob) {
+            const response = await fetch(`/api/predict/frame?sessionId=${encodeURIComponent(SESSION_ID)}`, {
+                method: 'POST',
+                headers: { 'Content-Type': blob.type },
+                body: blob
+            });
+            if (response.status !== 404 && response.status !== 415) return response;
+        }
+        useBinaryUpload = false;
+    }
+
+    // Prefer WebP if supported; fallback to JPEG otherwise
+    let base64Image;
+    try {
+        base64Image = canvas.toDataURL('image/webp', 0.7);
+    } catch (_) {
+        base64Image = canvas.toDataURL('image/jpeg', 0.7);
+    }
+
+    return fetch('/api/predict', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ image: base64Image, sessionId: SESSION_ID })
+    });
+}
+
 async function sendFrameToBackend() {
     if (!video || !cameraOn || inflight) return;
 
@@ -84,23 +129,18 @@ async function sendFrameToBackend() {
     const ctx = canvas.getContext('2d');
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
 
-    // Prefer WebP if supported; fallback to JPEG otherwise
-    let base64Image;
-    try {
-        base64Image = canvas.toDataURL('image/webp', 0.7);
-    } catch (_) {
-        base64Image = canvas.toDataURL('image/jpeg', 0.7);
-    }
-
     try {
-        const response = await fetch('/api/predict', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ image: base64Image, sessionId: SESSION_ID })
-        });
-
+        const response = await postFrame(canvas);
         const result = await response.json();
-        if (result.error) {
+        if (typeof result.nextFrameMs === 'number') {
+            nextFrameMs = Math.min(2000, Math.max(100, result.nextFrameMs));
+        }
+        if (result.status === 'warming up') {
+            // Server is still loading the model (HTTP 503); keep polling at nextFrameMs
+            detectionStatusText.textContent = 'Warming up...';
+            detectionConfidence.textContent = '—';
+            detectedSign.textContent = '—';
+        } else if (result.error) {
             detectionStatusText.textContent = 'Error';
             detectionConfidence.textContent = '—';
             detectedSign.textContent = '—';
@@ -129,6 +169,15 @@ async function sendFrameToBackend() {
     }
 }
 
+// Next frame is scheduled after the previous response, at the server-suggested rate
+function scheduleNextFrame() {
+    if (!cameraOn) return;
+    frameTimer = setTimeout(async () => {
+        await sendFrameToBackend();
+        scheduleNextFrame();
+    }, nextFrameMs);
+}
+
 // When camera starts, begin sending frames
 async function startCamera() {
     try {
@@ -140,8 +189,9 @@ async function startCamera() {
         detectionConfidence.textContent = '—';
         detectedSign.textContent = '—';
 
-        // Start sending frames every 250ms; request is throttled by inflight flag
-        intervalId = setInterval(sendFrameToBackend, 250);
+        // Start sending frames (every 250ms unless the server asks for fewer)
+        nextFrameMs = DEFAULT_FRAME_MS;
+        scheduleNextFrame();
     } catch (err) {
         console.error('Error accessing camera:', err);
         alert('Could not access the camera.');
@@ -159,7 +209,8 @@ function stopCamera() {
     detectionConfidence.textContent = '—';
     detectedSign.textContent = '—';
 
-    if (intervalId) clearInterval(intervalId);
+    if (frameTimer) clearTimeout(frameTimer);
+    frameTimer = null;
 }
 
 // Update UI